@@ -1,13 +1,28 @@
-import os, time, requests, textwrap, json, numpy as np, cloudinary, cloudinary.uploader, difflib, re, random
+import os, time, textwrap, json, numpy as np, re, random
 from PIL import Image, ImageDraw, ImageFont, ImageFile, ImageFilter
-from moviepy.editor import VideoFileClip, CompositeVideoClip, ImageClip, AudioFileClip, vfx
-from groq import Groq
 from datetime import datetime
-from newspaper import Article
-from duckduckgo_search import DDGS
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from lazy import Lazy
+from motion import MotionEngine, stretch_path
+from encoder import encode
+from audio_bed import track as audio_bed
+from compositor import Compositor
+from render_debug import dump
+from assets import path as asset, prefetch as prefetch_assets
+from image_ingest import load as load_image, format_stats as image_stats
+from skin_cache import base_layer, gradient_layer
+from fonts import get_font, fit_text as fit_lines
+from pipeline import run as run_pipeline
+import llm, net
+from compress import compress
+from prefetch import Prefetcher
+from article_cache import fetch as fetch_cached, RUN as article_stats
+from llm_cache import stats as cache_stats, format_stats
+from dedup import is_duplicate
+from publisher import publish_all, format_report
+from fb_upload import upload as fb_upload, fb_status, format_report as upload_report
+import artifact_cache as artifacts
+import spans
+from poller import poll, report as poll_report, ig_container_state, fb_finish_state
 
 # --- CONFIGURATION (READS DIRECTLY FROM YOUR SECRETS) ---
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
@@ -26,7 +41,19 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_ADMIN_ID = os.getenv("TELEGRAM_ADMIN_ID")
 
 ImageFile.LOAD_TRUNCATED_IMAGES = True
-cloudinary.config(cloud_name=CLOUDINARY_CLOUD_NAME, api_key=CLOUDINARY_API_KEY, api_secret=CLOUDINARY_API_SECRET)
+
+# Heavy clients load on first use, so a run that finds no news never imports them
+Article = Lazy("newspaper", "Article")
+DDGS = Lazy("duckduckgo_search", "DDGS")
+Credentials = Lazy("google.oauth2.credentials", "Credentials")
+build = Lazy("googleapiclient.discovery", "build")
+MediaFileUpload = Lazy("googleapiclient.http", "MediaFileUpload")
+
+def _cloudinary(m):
+    import cloudinary.uploader
+    m.config(cloud_name=CLOUDINARY_CLOUD_NAME, api_key=CLOUDINARY_API_KEY, api_secret=CLOUDINARY_API_SECRET)
+
+cloudinary = Lazy("cloudinary", then=_cloudinary)
 
 # --- 1. SETUP & ASSETS ---
 PREMIUM_SOURCES = [
@@ -40,11 +67,8 @@ def log(step, msg):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] 🔹 {step.upper()}: {msg}")
 
 def ensure_assets():
-    os.makedirs('assets/audio', exist_ok=True)
-    tracks = {"crisis": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3", "tech": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-2.mp3", "general": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-3.mp3"}
-    for n, u in tracks.items():
-        if not os.path.exists(f"assets/audio/{n}.mp3"): os.system(f"wget -q -O assets/audio/{n}.mp3 {u}")
-    if not os.path.exists("Anton.ttf"): os.system("wget -q -O Anton.ttf https://github.com/google/fonts/raw/main/ofl/anton/Anton-Regular.ttf")
+    # Fonts up front (every render needs them); the mood track is fetched lazily by render_video
+    prefetch_assets("Anton.ttf")
 
 # --- 2. INTELLIGENCE ---
 def get_best_groq_model(client):
@@ -66,34 +90,57 @@ def is_garbage(title):
     t = title.lower()
     ads = ["gift guide", "buying guide", "deals", "opinion", "editorial", "watch:", "letter to", "horoscope", "perspective", "analysis", "save $", "shop", "top picks", "review", "best of"]
     if any(x in t for x in ads): return True
-    if not os.path.exists("history_v2.txt"): return False
-    with open("history_v2.txt", "r") as f:
-        for l in f:
-            if "|" in l and difflib.SequenceMatcher(None, t, l.split("|")[0].lower()).ratio() > 0.8: return True
-    return False
+    return is_duplicate(t, "history_v2.txt")
 
+@spans.traced("news")
 def fetch_news():
     log("NEWS", "Sourcing from Elite List...")
     cands = []
     try:
-        r = requests.get(f"https://newsapi.org/v2/top-headlines?sources={','.join(PREMIUM_SOURCES)}&apiKey={NEWS_API_KEY}", timeout=15).json()
+        r = net.get(f"https://newsapi.org/v2/top-headlines?sources={','.join(PREMIUM_SOURCES)}&apiKey={NEWS_API_KEY}", timeout=15).json()
         if r.get('status') == 'ok': cands.extend([a for a in r['articles'] if a.get('urlToImage') and not is_garbage(a['title'])])
     except: pass
     return cands[:15]
 
+def extract_text(url, html):
+    art = Article(url); art.download(input_html=html); art.parse()
+    return art.text
+
+@spans.traced("research.article", size=len)
+def fetch_article(article):
+    # Cached across runs: repeat headlines skip the download (or get a 304) and the parse
+    text = fetch_cached(article['url'], extract_text)
+    return text if text and len(text) > 500 else None
+
+@spans.traced("research.search", size=lambda r: sum(len(x) for x in r))
+def search_snippets(article):
+    with DDGS() as ddgs: return [r['body'] for r in ddgs.text(article['title'], max_results=3)]
+
+research = Prefetcher(fetch_article, search_snippets)
+
+@spans.traced("research", size=len)
 def perform_research(article):
     log("RESEARCH", f"Scanning: {article['title']}")
-    try:
-        art = Article(article['url']); art.download(); art.parse()
-        if len(art.text) > 500: return art.text[:2500]
-    except: pass
-    try:
-        with DDGS() as ddgs: return "\n".join([r['body'] for r in ddgs.text(article['title'], max_results=3)])
-    except: return article.get('description', '')
+    found, origin = research.sources(article)
+    ctx, rep = compress(found + [article.get('description')], article['title'])
+    log("RESEARCH", f"Context from {origin}: {rep['tokens_in']} -> {rep['tokens_out']} tokens ({rep['saved']} saved, {rep['sentences']} sentences)")
+    return ctx
 
+@spans.traced("llm")
 def generate_content(art, ctx):
-    client = Groq(api_key=GROQ_API_KEY)
-    model = get_best_groq_model(client)
+    story_prompt = (
+        f"Analyze this news: {art['title']}\nContext: {ctx}\n"
+        f"Goal: Create a SCRIPT for a viral short video and its post.\n"
+        f"Return JSON: {{\"mood\": \"CRISIS/TECH/GENERAL\", "
+        f"\"headline\": \"5-8 words. CLICKBAIT STYLE (e.g. 'You Won't Believe X').\", "
+        f"\"summary\": \"EXACTLY 20-25 words. HIGH ENERGY FACTS. No filler.\", "
+        f"\"caption\": \"Viral News Anchor style: 1. A shocking Hook question. 2. Three quick bullet points. 3. A debate question. No hashtags.\", "
+        f"\"hashtags\": [\"exactly 15, mixing Broad (e.g. #News) and Niche\"], "
+        f"\"deep_dive\": \"250 words starting with '🧠 DEEP DIVE:'. Tone: Informative but casual/fun.\"}}"
+    )
+    d = llm.story(GROQ_API_KEY, get_best_groq_model, story_prompt)
+    if d: return d['mood'], d['headline'], d['summary'], f"{d['caption']}\n\n{llm.hashtag_line(d['hashtags'])}", d['deep_dive']
+    log("AI", "Structured reply failed validation, using split calls")
     
     v_prompt = (
         f"Analyze this news: {art['title']}\nContext: {ctx}\n"
@@ -102,7 +149,7 @@ def generate_content(art, ctx):
         f"\"headline\": \"5-8 words. CLICKBAIT STYLE (e.g. 'You Won't Believe X').\", "
         f"\"summary\": \"EXACTLY 20-25 words. HIGH ENERGY FACTS. No filler.\"}}"
     )
-    v_data = json.loads(client.chat.completions.create(messages=[{"role":"user","content":v_prompt}], model=model, response_format={"type": "json_object"}).choices[0].message.content)
+    v_data = json.loads(llm.complete(GROQ_API_KEY, get_best_groq_model, v_prompt, json_mode=True))
     
     cap_prompt = (
         f"Write a caption for: '{art['title']}'. "
@@ -110,24 +157,18 @@ def generate_content(art, ctx):
         f"Structure: \n1. A shocking Hook question.\n2. Three quick bullet points.\n3. A debate question.\n"
         f"At the end, generate exactly 15 hashtags. Mix Broad (e.g. #News) and Niche (e.g. #{v_data['headline'].split()[0]})."
     )
-    caption = client.chat.completions.create(messages=[{"role":"user","content":cap_prompt}], model=model).choices[0].message.content.strip()
+    caption = llm.complete(GROQ_API_KEY, get_best_groq_model, cap_prompt).strip()
     
     div_prompt = f"250-word deep dive starting with '🧠 DEEP DIVE:' for: {art['title']}\nContext: {ctx}. Tone: Informative but casual/fun."
-    comment = client.chat.completions.create(messages=[{"role":"user","content":div_prompt}], model=model).choices[0].message.content.strip()
+    comment = llm.complete(GROQ_API_KEY, get_best_groq_model, div_prompt).strip()
     
     return v_data['mood'], v_data['headline'], v_data['summary'], caption, comment
 
 # --- 3. TITANIUM RENDERER (VIRAL MODE: 3s + Silent Audio) ---
 def fit_text(draw, text, max_w, max_h, start_size):
-    size = start_size
-    while size > 25:
-        try: font = ImageFont.truetype("Anton.ttf", size)
-        except: font = ImageFont.load_default()
-        lines = textwrap.wrap(text, width=int(max_w/(size*0.55)))
-        th = sum([draw.textbbox((0,0), l, font=font)[3] - draw.textbbox((0,0), l, font=font)[1] + 15 for l in lines])
-        if th < max_h: return font, lines
-        size -= 4
-    return ImageFont.load_default(), textwrap.wrap(text, width=30)
+    fallback = lambda: (ImageFont.load_default(), textwrap.wrap(text, width=30)) # abc_bot's old loop ended here, not on Anton 25
+    try: return fit_lines(text, max_w, max_h, start_size, asset("Anton.ttf"), fallback=fallback)
+    except OSError: return fallback()
 
 def add_film_grain(img, opacity=0.04):
     arr = np.array(img)
@@ -139,112 +180,116 @@ def add_film_grain(img, opacity=0.04):
     img.paste(grain, (0,0), grain)
     return img.convert("RGB")
 
-def render_video(art, mood, hl, summ):
+def headline_bar(W, H, box_color):
+    base = Image.new('RGBA', (W, H), (0,0,0,100))
+    ImageDraw.Draw(base).rectangle([(0, 200), (W, 700)], fill=box_color)
+    return base
+
+def skin_base(skin, W, H, color, src, box_color):
+    # Background of each skin: cached gradient / headline bar, then the source label drawn per render
+    if skin == "classic":
+        base = gradient_layer(W, H, int(H*0.45), 240)
+        draw = ImageDraw.Draw(base)
+        f_s = get_font(asset("Anton.ttf"), 35)
+        sn = f" {src} "
+        draw.rounded_rectangle([(60,150), (60+draw.textlength(sn, f_s)+20, 210)], 12, fill=color)
+        draw.text((70,160), sn, font=f_s, fill="black")
+    elif skin == "headline":
+        base = base_layer(("headline", box_color, W, H), lambda: headline_bar(W, H, box_color))
+        draw = ImageDraw.Draw(base)
+        draw.text((50, 1600), f" SOURCE: {src} ", font=get_font(asset("Anton.ttf"), 40), fill=color)
+    else:
+        base = Image.new('RGBA', (W, H), (0,0,0,80))
+    return base
+
+SKINS = ["classic", "headline", "poster"]
+
+@spans.traced("render.overlay")
+def render_skin(skin, hl, summ, src, color, box_color):
+    # Overlay for one story: skin background + headline and summary laid out per skin
+    W, H = 1080, 1920
+    overlay = skin_base(skin, W, H, color, src, box_color)
+    draw = ImageDraw.Draw(overlay)
+
+    if skin == "classic":
+        cy = 600
+        f_h, h_l = fit_text(draw, hl.upper(), 900, 600, 140)
+        for l in h_l:
+            draw.text((65, cy+5), l, font=f_h, fill="black")
+            draw.text((60, cy), l, font=f_h, fill=color)
+            cy += f_h.size + 15
+        f_u, s_l = fit_text(draw, summ, 900, 1500-cy, 100)
+        cy += 30
+        for l in s_l:
+            draw.text((60, cy), l, font=f_u, fill="white")
+            cy += f_u.size + 12
+
+    elif skin == "headline":
+        cy = 250
+        f_h, h_l = fit_text(draw, hl.upper(), 1000, 450, 140)
+        for l in h_l:
+            draw.text((50, cy), l, font=f_h, fill="white")
+            cy += f_h.size + 10
+        cy = 1300
+        f_u, s_l = fit_text(draw, summ, 1000, 400, 90)
+        for l in s_l:
+            draw.text((50, cy), l, font=f_u, fill="white", stroke_width=2, stroke_fill="black")
+            cy += f_u.size + 10
+
+    elif skin == "poster":
+        f_h, h_l = fit_text(draw, hl.upper(), 950, 800, 160)
+        total_h = sum([f_h.size for _ in h_l])
+        start_y = (H - total_h) / 2 - 100
+        for l in h_l:
+            draw.text((60, start_y+5), l, font=f_h, fill="black")
+            draw.text((55, start_y), l, font=f_h, fill=color)
+            start_y += f_h.size + 15
+        f_u, s_l = fit_text(draw, summ, 900, 500, 80)
+        start_y += 50
+        for l in s_l:
+            draw.text((60, start_y), l, font=f_u, fill="white", stroke_width=3, stroke_fill="black")
+            start_y += f_u.size + 10
+    return overlay
+
+OUTPUT = "final_abc.mp4" # per bot: main, newsroom and abc_bot share one working dir under daemon.py
+
+@spans.traced("render", size=os.path.getsize)
+def render_video(art, mood, hl, summ, skin=None):
     ensure_assets()
-    cfg = {"crisis": {"c": "#FF0000", "a": "assets/audio/crisis.mp3"}, "tech": {"c": "#00F0FF", "a": "assets/audio/tech.mp3"}, "general": {"c": "#FFD700", "a": "assets/audio/general.mp3"}}.get(mood.lower(), {"c": "#FFD700", "a": "assets/audio/general.mp3"})
+    cfg = {"crisis": {"c": "#FF0000", "a": "song1.mp3"}, "tech": {"c": "#00F0FF", "a": "song2.mp3"}, "general": {"c": "#FFD700", "a": "song3.mp3"}}.get(mood.lower(), {"c": "#FFD700", "a": "song3.mp3"})
     
     try:
-        r = requests.get(art['urlToImage'], timeout=15)
-        with open("bg.jpg", "wb") as f: f.write(r.content)
-        Image.open("bg.jpg").verify()
+        img, st, raw = load_image(art['urlToImage'])
+        dump("source", raw)
+        log("RENDER", f"Image: {image_stats(st)}")
     except Exception as e: return None
 
     try:
-        W, H = 1080, 1920
-        overlay = Image.new('RGBA', (W, H), (0,0,0,0))
-        draw = ImageDraw.Draw(overlay)
-        grad = Image.new('L', (W, H), 0)
-        
         # --- SKINS ---
-        skin = random.choice(["classic", "headline", "poster"])
+        skin = skin or random.choice(SKINS)
         log("RENDER", f"Applying Skin: {skin.upper()}")
+        src = art['source']['name'].upper()
+        box_color = (139, 0, 0, 230) if "crisis" in mood.lower() else (20, 20, 20, 230)
+        overlay = render_skin(skin, hl, summ, src, cfg["c"], box_color)
 
-        if skin == "classic":
-            for y in range(int(H*0.45), H): ImageDraw.Draw(grad).line([(0,y),(W,y)], fill=int((y-H*0.45)/(H*0.55)*255))
-            overlay.paste(Image.new('RGBA',(W,H),(0,0,0,240)), (0,0), mask=grad)
-            f_s = ImageFont.truetype("Anton.ttf", 35)
-            sn = f" {art['source']['name'].upper()} "
-            draw.rounded_rectangle([(60,150), (60+draw.textlength(sn, f_s)+20, 210)], 12, fill=cfg["c"])
-            draw.text((70,160), sn, font=f_s, fill="black")
-            cy = 600
-            f_h, h_l = fit_text(draw, hl.upper(), 900, 600, 140)
-            for l in h_l:
-                draw.text((65, cy+5), l, font=f_h, fill="black")
-                draw.text((60, cy), l, font=f_h, fill=cfg["c"])
-                cy += f_h.size + 15
-            f_u, s_l = fit_text(draw, summ, 900, 1500-cy, 100)
-            cy += 30
-            for l in s_l:
-                draw.text((60, cy), l, font=f_u, fill="white")
-                cy += f_u.size + 12
-
-        elif skin == "headline":
-            overlay.paste(Image.new('RGBA',(W,H),(0,0,0,100)), (0,0))
-            box_color = (139, 0, 0, 230) if "crisis" in mood.lower() else (20, 20, 20, 230)
-            draw.rectangle([(0, 200), (W, 700)], fill=box_color)
-            cy = 250
-            f_h, h_l = fit_text(draw, hl.upper(), 1000, 450, 140)
-            for l in h_l:
-                draw.text((50, cy), l, font=f_h, fill="white")
-                cy += f_h.size + 10
-            f_s = ImageFont.truetype("Anton.ttf", 40)
-            sn = f" SOURCE: {art['source']['name'].upper()} "
-            draw.text((50, 1600), sn, font=f_s, fill=cfg["c"])
-            cy = 1300
-            f_u, s_l = fit_text(draw, summ, 1000, 400, 90)
-            for l in s_l:
-                draw.text((50, cy), l, font=f_u, fill="white", stroke_width=2, stroke_fill="black")
-                cy += f_u.size + 10
-
-        elif skin == "poster":
-            overlay.paste(Image.new('RGBA',(W,H),(0,0,0,80)), (0,0))
-            f_h, h_l = fit_text(draw, hl.upper(), 950, 800, 160)
-            total_h = sum([f_h.size for _ in h_l])
-            start_y = (H - total_h) / 2 - 100
-            for l in h_l:
-                draw.text((60, start_y+5), l, font=f_h, fill="black")
-                draw.text((55, start_y), l, font=f_h, fill=cfg["c"])
-                start_y += f_h.size + 15
-            f_u, s_l = fit_text(draw, summ, 900, 500, 80)
-            start_y += 50
-            for l in s_l:
-                draw.text((60, start_y), l, font=f_u, fill="white", stroke_width=3, stroke_fill="black")
-                start_y += f_u.size + 10
-
-        overlay.save("overlay.png")
-        
-        img = Image.open("bg.jpg").convert("RGB")
-        bw, bh = img.size; ratio = 1080/1920
-        if bw/bh > ratio: nw = bh * ratio; img = img.crop(((bw-nw)/2, 0, (bw+nw)/2, bh))
-        else: nh = bw/ratio; img = img.crop((0, (bh-nh)/2, bw, (bh-nh)/2 + nh))
-        img = img.resize((1080, 1920), Image.LANCZOS)
-        
         if skin == "poster": img = add_film_grain(img, opacity=0.04)
-        img.save("temp_bg.jpg")
         
         # CHANGED: 3-Second Viral Loop setup
-        clip = ImageClip("temp_bg.jpg").set_duration(3).fl(lambda gf, t: np.array(Image.fromarray(gf(t)).resize([int(1080 + 10 * t), 1920], Image.BILINEAR).crop((0,0,1080,1920))))
-        final = CompositeVideoClip([clip, ImageClip("overlay.png").set_duration(3)])
+        dump("background", img)
+        clip = MotionEngine(img, stretch_path(10))
+        ui = Compositor(overlay)
+        frame = lambda t: ui.apply(clip.frame(t))
+        dump("overlay", overlay); dump("frame0", lambda: frame(0))
         
         # AUDIO JITTER + SILENT MODE (0.1% - 0.5%)
-        if os.path.exists(cfg["a"]): 
-            # CHANGED: 0.001 to 0.005 is -50dB. Basically silent.
-            vol = random.uniform(0.009, 0.005) 
-            speed = random.uniform(0.98, 1.02)
-            
-            # CHANGED: Load 4s, trim to exactly 3s
-            audio = AudioFileClip(cfg["a"]).subclip(0,4) 
-            audio = audio.fx(vfx.speedx, speed)
-            audio = audio.volumex(vol)
-            audio = audio.subclip(0,3) # HARD CUT at 3s
+        # CHANGED: 0.001 to 0.005 is -50dB. Basically silent.
+        vol = random.uniform(0.009, 0.005) 
+        speed = random.uniform(0.98, 1.02)
             
-            final = final.set_audio(audio)
-            
-        # FORCE FINAL DURATION to 3s (Safety Lock)
-        final = final.set_duration(3)
-
-        final.write_videofile("final.mp4", fps=24, codec='libx264', audio_codec='aac', bitrate=str(random.randint(3000, 5500))+"k", preset='ultrafast', logger=None)
-        return "final.mp4"
+        # 3s HARD CUT (Safety Lock) is enforced by the encoder
+        enc = encode(OUTPUT, frame, 3, 24, audio=audio_bed(cfg["a"], 3, speed=speed, volume=vol), bitrate=str(random.randint(3000, 5500))+"k")
+        log("RENDER", f"Encoded {enc['frames']} frames in {enc['seconds']:.1f}s ({enc['bytes']} bytes)")
+        return OUTPUT
     except Exception as e:
         log("RENDER_FAIL", str(e))
         return None
@@ -253,36 +298,41 @@ def render_video(art, mood, hl, summ):
 def send_telegram(msg):
     try:
         if TELEGRAM_BOT_TOKEN and TELEGRAM_ADMIN_ID:
-            requests.post(f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage", data={"chat_id": TELEGRAM_ADMIN_ID, "text": msg})
+            net.post(f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage", data={"chat_id": TELEGRAM_ADMIN_ID, "text": msg})
     except: pass
 
 def post_instagram(path, cap, comm):
     try:
-        up = cloudinary.uploader.upload(path, resource_type="video")
-        r = requests.post(f"https://graph.facebook.com/v18.0/{IG_USER_ID}/media", data={"media_type": "REELS", "video_url": up['secure_url'], "caption": cap, "access_token": IG_ACCESS_TOKEN}).json()
-        if 'id' in r:
-            cid = r['id']
-            for _ in range(15):
-                time.sleep(10)
-                s = requests.get(f"https://graph.facebook.com/v18.0/{cid}", params={"fields":"status_code", "access_token": IG_ACCESS_TOKEN}).json()
-                if s.get('status_code') == 'FINISHED':
-                    p = requests.post(f"https://graph.facebook.com/v18.0/{IG_USER_ID}/media_publish", data={"creation_id": cid, "access_token": IG_ACCESS_TOKEN}).json()
-                    if 'id' in p:
-                        time.sleep(5)
-                        requests.post(f"https://graph.facebook.com/v18.0/{p['id']}/comments", data={"message": comm, "access_token": IG_ACCESS_TOKEN})
-                        return True
+        url = artifacts.remember(path, "cloudinary", lambda: cloudinary.uploader.upload(path, resource_type="video")['secure_url'])
+        scope = (IG_USER_ID, cap)
+        cid = artifacts.remember(path, "ig_container", lambda: net.post(f"https://graph.facebook.com/v18.0/{IG_USER_ID}/media", data={"media_type": "REELS", "video_url": url, "caption": cap, "access_token": IG_ACCESS_TOKEN}).json().get('id'), scope)
+        if cid:
+            st = poll(lambda: ig_container_state(net.get(f"https://graph.facebook.com/v18.0/{cid}", params={"fields":"status_code", "access_token": IG_ACCESS_TOKEN}, timeout=20).json()), "IG", deadline=150)
+            if st['state'] in ("error", "published"): artifacts.drop(path, "ig_container", scope)
+            if st['ok']:
+                artifacts.drop(path, "ig_container", scope) # used up whether media_publish succeeds, returns no id or raises
+                p = net.post(f"https://graph.facebook.com/v18.0/{IG_USER_ID}/media_publish", data={"creation_id": cid, "access_token": IG_ACCESS_TOKEN}).json()
+                if 'id' in p:
+                    time.sleep(5)
+                    net.post(f"https://graph.facebook.com/v18.0/{p['id']}/comments", data={"message": comm, "access_token": IG_ACCESS_TOKEN})
+                    return True
         return False
     except: return False
 
 def post_facebook(path, cap, deep_dive):
     try:
-        init = requests.post(f"https://graph.facebook.com/v18.0/{FB_PAGE_ID}/video_reels", data={"upload_phase": "start", "access_token": FB_ACCESS_TOKEN}).json()
-        if 'video_id' not in init: return False
-        vid_id, upload_url = init['video_id'], init['upload_url']
-        with open(path, 'rb') as f: requests.post(upload_url, headers={"Authorization": f"OAuth {FB_ACCESS_TOKEN}", "offset": "0", "file_size": str(os.path.getsize(path))}, data=f.read())
-        time.sleep(30)
-        fin = requests.post(f"https://graph.facebook.com/v18.0/{FB_PAGE_ID}/video_reels", data={"upload_phase": "finish", "video_id": vid_id, "video_state": "PUBLISHED", "description": f"{cap}\n\n---\n{deep_dive}", "access_token": FB_ACCESS_TOKEN}).json()
-        return 'success' in fin and fin['success']
+        vid_id = artifacts.get(path, "fb_video", FB_PAGE_ID)
+        if not vid_id:
+            init = net.post(f"https://graph.facebook.com/v18.0/{FB_PAGE_ID}/video_reels", data={"upload_phase": "start", "access_token": FB_ACCESS_TOKEN}).json()
+            if 'video_id' not in init: return False
+            vid_id, upload_url = init['video_id'], init['upload_url']
+            up = fb_upload(path, upload_url, FB_ACCESS_TOKEN, status=fb_status(vid_id, FB_ACCESS_TOKEN))
+            log("FB", f"Upload: {upload_report(up)}")
+            if not up['ok']: return False
+            artifacts.put(path, "fb_video", vid_id, FB_PAGE_ID)
+        st = poll(lambda: fb_finish_state(net.post(f"https://graph.facebook.com/v18.0/{FB_PAGE_ID}/video_reels", data={"upload_phase": "finish", "video_id": vid_id, "video_state": "PUBLISHED", "description": f"{cap}\n\n---\n{deep_dive}", "access_token": FB_ACCESS_TOKEN}, timeout=30).json()), "FB", deadline=120, first=5)
+        if st['state'] != "timeout": artifacts.drop(path, "fb_video", FB_PAGE_ID)
+        return st['ok']
     except: return False
 
 def post_youtube(path, title, description, tags):
@@ -294,24 +344,40 @@ def post_youtube(path, title, description, tags):
         return 'id' in request.execute()
     except: return False
 
-if __name__ == "__main__":
-    ensure_assets()
+def finish_candidate(art, content):
+    m, h, s, cp, cm = content
+    v = render_video(art, m, h, s)
+    if v:
+        rep = publish_all({"IG": (post_instagram, v, cp, cm), "FB": (post_facebook, v, cp, cm), "YT": (post_youtube, v, h + " #shorts", f"{cp}\n\n---\n{cm}", cp)})
+        ig, fb, yt = rep["IG"]["ok"], rep["FB"]["ok"], rep["YT"]["ok"]
+        log("PUBLISH", format_report(rep))
+        msg = f"📰 {art['title']}\nIG:{ig} FB:{fb} YT:{yt}"
+        send_telegram(f"{msg}\n⏱ {spans.breakdown()}")
+        if ig or fb or yt:
+            with open("history_v2.txt", "a") as f: f.write(f"{art['title']}|{art['url']}\n")
+            log("SUCCESS", msg)
+            return True
+    return False
+
+@spans.scoped("abc_bot")
+def run():
+    # One pass: fetch, research/write, render and post until a candidate is published. -> the published article or None
     log("BOT", "Empire Titanium Engine V4 (Direct Secrets)...")
     cands = fetch_news()
-    if cands:
-        for art in cands:
-            try:
-                ctx = perform_research(art)
-                m, h, s, cp, cm = generate_content(art, ctx)
-                v = render_video(art, m, h, s)
-                if v:
-                    ig = post_instagram(v, cp, cm)
-                    fb = post_facebook(v, cp, cm)
-                    yt = post_youtube(v, h + " #shorts", f"{cp}\n\n---\n{cm}", cp)
-                    msg = f"📰 {art['title']}\nIG:{ig} FB:{fb} YT:{yt}"
-                    send_telegram(msg)
-                    if ig or fb or yt:
-                        with open("history_v2.txt", "a") as f: f.write(f"{art['title']}|{art['url']}\n")
-                        log("SUCCESS", msg)
-                        break
-            except Exception as e: log("ERROR", str(e))
+    if not cands:
+        log("BOT", "No News.")
+        return None
+    ensure_assets() # only once there is something to render
+    research.start(cands) # every candidate's article downloads while the first one is processed
+    stages = [("research", lambda art, _: perform_research(art)), ("llm", generate_content)]
+    try: winner = run_pipeline(cands, stages, finish_candidate, on_error=lambda art, e: log("ERROR", str(e)))
+    finally: research.close()
+    log("RESEARCH", f"Article cache: {article_stats}")
+    log("AI", f"LLM cache: {format_stats(cache_stats())}")
+    log("PUBLISH", f"Artifact cache: {artifacts.RUN}")
+    log("PUBLISH", f"Processing times: {poll_report()}")
+    log("TIMING", spans.breakdown())
+    return winner
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,73 @@
+# article_cache.py - extracted article text kept across runs, keyed by canonical URL, revalidated with ETag/Last-Modified
+import os, time, sqlite3, threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import net
+
+PATH = os.getenv("ARTICLE_CACHE_PATH", ".cache/articles.sqlite")
+FRESH = int(os.getenv("ARTICLE_CACHE_FRESH", str(6 * 3600))) # served without any request
+TTL = int(os.getenv("ARTICLE_CACHE_TTL", str(3 * 24 * 3600))) # kept for conditional GETs until then
+MAX_BYTES = int(os.getenv("ARTICLE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+_lock = threading.Lock()
+_db = None
+RUN = {"fresh": 0, "revalidated": 0, "fetched": 0}
+
+def _conn():
+    global _db
+    if _db is None:
+        if os.path.dirname(PATH): os.makedirs(os.path.dirname(PATH), exist_ok=True)
+        _db = sqlite3.connect(PATH, timeout=10, check_same_thread=False, isolation_level=None)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute("CREATE TABLE IF NOT EXISTS articles (url TEXT PRIMARY KEY, etag TEXT, modified TEXT, text TEXT, checked REAL, created REAL, bytes INTEGER)")
+    return _db
+
+def canonical(url):
+    # Same article behind tracking params, fragments, host case or a trailing slash -> one key
+    p = urlsplit(url.strip())
+    q = sorted((k, v) for k, v in parse_qsl(p.query, keep_blank_values=True) if not k.lower().startswith(("utm_", "fbclid", "gclid", "ocid", "cmpid", "at_")))
+    host = (p.hostname or "").lower()
+    host = host[4:] if host.startswith("www.") else host
+    return urlunsplit(("https" if p.scheme in ("http", "https") else p.scheme, host, p.path.rstrip("/") or "/", urlencode(q), ""))
+
+def _row(key):
+    with _lock: return _conn().execute("SELECT etag, modified, text, checked FROM articles WHERE url = ? AND created > ?", (key, time.time() - TTL)).fetchone()
+
+def _store(key, etag, modified, text):
+    now = time.time()
+    with _lock:
+        db = _conn()
+        db.execute("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)", (key, etag, modified, text, now, now, len(text.encode())))
+        db.execute("DELETE FROM articles WHERE created <= ?", (now - TTL,))
+        total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM articles").fetchone()[0]
+        for k, b in (db.execute("SELECT url, bytes FROM articles ORDER BY checked").fetchall() if total > MAX_BYTES else []):
+            if total <= MAX_BYTES: break
+            db.execute("DELETE FROM articles WHERE url = ?", (k,))
+            total -= b
+
+def _touch(key):
+    with _lock: _conn().execute("UPDATE articles SET checked = ? WHERE url = ?", (time.time(), key))
+
+def fetch(url, extract, timeout=(5, 10)):
+    # extract(url, html) -> text, html being str or undecoded bytes. Fresh entries cost nothing; older ones cost one conditional GET and no parse on 304.
+    key = canonical(url)
+    try: row = _row(key)
+    except sqlite3.Error: row = None
+    headers = {}
+    if row:
+        if time.time() - row[3] < FRESH:
+            RUN["fresh"] += 1
+            return row[2]
+        if row[0]: headers["If-None-Match"] = row[0]
+        if row[1]: headers["If-Modified-Since"] = row[1]
+    r = net.get(url, headers=headers, timeout=timeout)
+    if r.status_code == 304 and row:
+        RUN["revalidated"] += 1
+        try: _touch(key)
+        except sqlite3.Error: pass
+        return row[2]
+    r.raise_for_status()
+    # No charset in the header: requests would decode as ISO-8859-1, so hand over bytes and let the parser read <meta charset>
+    text = extract(url, r.text if "charset" in r.headers.get("Content-Type", "").lower() else r.content)
+    RUN["fetched"] += 1
+    try: _store(key, r.headers.get("ETag"), r.headers.get("Last-Modified"), text or "")
+    except sqlite3.Error: pass
+    return text
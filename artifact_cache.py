@@ -0,0 +1,74 @@
+# artifact_cache.py - remote copies of a rendered file (Cloudinary URL, IG container, FB video id) keyed by its sha256
+import os, json, time, hashlib, threading
+from spans import span
+
+PATH = os.getenv("ARTIFACT_CACHE_PATH", ".cache/artifacts.json")
+# How long each kind of remote artifact stays usable. IG containers expire after 24h, unpublished FB uploads sooner.
+TTL = {"cloudinary": int(os.getenv("ARTIFACT_TTL_CLOUDINARY", str(7 * 24 * 3600))),
+       "ig_container": int(os.getenv("ARTIFACT_TTL_IG", str(20 * 3600))),
+       "fb_video": int(os.getenv("ARTIFACT_TTL_FB", str(6 * 3600)))}
+_lock = threading.Lock()
+_digests = {}
+RUN = {"reused": 0, "stored": 0, "bytes_saved": 0}
+
+def digest(path):
+    # Hashed once per (path, size, mtime), streamed so the render is never fully in memory
+    st = os.stat(path)
+    k = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if k not in _digests:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""): h.update(block)
+        _digests[k] = h.hexdigest()
+    return _digests[k]
+
+def _key(path, kind, scope):
+    # scope separates artifacts that depend on more than the bytes (account id, caption)
+    s = hashlib.sha1(repr(scope).encode()).hexdigest()[:12] if scope else ""
+    return f"{digest(path)}:{kind}:{s}"
+
+def _load():
+    try:
+        with open(PATH) as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def _save(entries):
+    now = time.time()
+    entries = {k: v for k, v in entries.items() if v["expires"] > now}
+    if os.path.dirname(PATH): os.makedirs(os.path.dirname(PATH), exist_ok=True)
+    tmp = f"{PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f: json.dump(entries, f)
+    os.replace(tmp, PATH) # other bots sharing .cache never see a half-written file
+
+def get(path, kind, scope=None):
+    with _lock: e = _load().get(_key(path, kind, scope))
+    if e and e["expires"] > time.time():
+        RUN["reused"] += 1; RUN["bytes_saved"] += os.path.getsize(path)
+        return e["value"]
+    return None
+
+def put(path, kind, value, scope=None, ttl=None):
+    k = _key(path, kind, scope)
+    with _lock:
+        entries = _load()
+        entries[k] = {"value": value, "expires": time.time() + (ttl or TTL.get(kind, 3600))}
+        try: _save(entries)
+        except OSError: pass
+    RUN["stored"] += 1
+    return value
+
+def drop(path, kind, scope=None):
+    # For artifacts that are used up (published container/video) or rejected by the platform
+    k = _key(path, kind, scope)
+    with _lock:
+        entries = _load()
+        if entries.pop(k, None) is not None:
+            try: _save(entries)
+            except OSError: pass
+
+def remember(path, kind, make, scope=None, ttl=None):
+    # Cached value for this file, else make() -> value, stored only if truthy
+    v = get(path, kind, scope)
+    if v: return v
+    with span(f"publish.{kind}", bytes=os.path.getsize(path)): v = make() # cloudinary upload, IG container create, ...
+    return put(path, kind, v, scope, ttl) if v else v
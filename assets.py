@@ -0,0 +1,143 @@
+# assets.py - fonts and audio beds in one content-addressed store shared by every bot, fetched lazily and checksummed
+import os, json, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+import net
+
+STORE = os.getenv("ASSET_STORE", ".cache/assets")
+MANIFEST = os.path.join(STORE, "manifest.json") # name -> sha256 for names not pinned below, recorded on a length-checked first download
+MIRROR = os.getenv("ASSET_MIRROR", "") # local dir or base URL holding files under their asset names; stands in for the upstream URLs
+GF = "https://github.com/google/fonts/raw/main"
+SH = "https://www.soundhelix.com/examples/mp3"
+# name -> (upstream url, pinned sha256). Pins are authoritative; fill them with `python assets.py --pin` (None = not pinned yet)
+CATALOG = {
+    "Anton.ttf": (f"{GF}/ofl/anton/Anton-Regular.ttf", None),
+    "Oswald.ttf": (f"{GF}/ofl/oswald/static/Oswald-Bold.ttf", None),
+    "Roboto.ttf": (f"{GF}/apache/robotocondensed/static/RobotoCondensed-Bold.ttf", None),
+    "Bebas.ttf": (f"{GF}/ofl/bebasneue/BebasNeue-Regular.ttf", None),
+    "Lobster.ttf": (f"{GF}/ofl/lobster/Lobster-Regular.ttf", None),
+    "Courier.ttf": (f"{GF}/apache/courierprime/CourierPrime-Bold.ttf", None),
+    "song1.mp3": (f"{SH}/SoundHelix-Song-1.mp3", None),
+    "song2.mp3": (f"{SH}/SoundHelix-Song-2.mp3", None),
+    "song3.mp3": (f"{SH}/SoundHelix-Song-3.mp3", None),
+    "song15.mp3": (f"{SH}/SoundHelix-Song-15.mp3", None),
+}
+MAGIC = {".ttf": (b"\x00\x01\x00\x00", b"true", b"OTTO"), ".mp3": (b"ID3", b"\xff\xfb", b"\xff\xf3", b"\xff\xf2", b"\xff\xfa")}
+_lock = threading.Lock()
+_flights, _verified, _resolved = {}, set(), {}
+RUN = {"hits": 0, "fetched": 0, "bytes": 0}
+
+def _manifest():
+    try:
+        with open(MANIFEST) as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def _record(name, digest):
+    with _lock:
+        m = _manifest(); m[name] = digest
+        tmp = f"{MANIFEST}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f: json.dump(m, f, indent=1, sort_keys=True)
+        os.replace(tmp, MANIFEST)
+
+def _blob(digest, name):
+    return os.path.join(STORE, digest + os.path.splitext(name)[1])
+
+def _expected(name):
+    return CATALOG[name][1] or _manifest().get(name)
+
+def _source(name):
+    # -> ("file", path) or ("http", url)
+    if MIRROR and not MIRROR.startswith(("http://", "https://")): return "file", os.path.join(MIRROR, name)
+    return "http", f"{MIRROR.rstrip('/')}/{name}" if MIRROR else CATALOG[name][0]
+
+def _read(p):
+    with open(p, "rb") as f: yield from iter(lambda: f.read(1 << 20), b"")
+
+def _download(name):
+    kind, src = _source(name)
+    os.makedirs(STORE, exist_ok=True)
+    tmp = os.path.join(STORE, f".{name}.{os.getpid()}.{threading.get_ident()}.part")
+    h, n, declared = hashlib.sha256(), 0, None
+    try:
+        r = None
+        with open(tmp, "wb") as out:
+            if kind == "file": chunks = _read(src)
+            else:
+                r = net.get(src, timeout=(5, 60), stream=True)
+                r.raise_for_status()
+                declared = int(r.headers.get("Content-Length") or 0) or None
+                chunks = r.iter_content(1 << 16)
+            for c in chunks:
+                if n == 0 and not c.startswith(MAGIC.get(os.path.splitext(name)[1], (b"",))): raise ValueError(f"{name}: unexpected file signature")
+                h.update(c); out.write(c); n += len(c)
+        if declared and n != declared: raise ValueError(f"{name}: truncated ({n}/{declared} bytes)")
+        digest, want = h.hexdigest(), _expected(name)
+        # Unpinned and no Content-Length: nothing to check a cut-short body against, and it would be recorded as the truth
+        if not want and not declared and kind == "http": raise ValueError(f"{name}: no pinned sha256 and no Content-Length to verify against")
+        if want and digest != want: raise ValueError(f"{name}: checksum mismatch ({digest[:12]} != {want[:12]})")
+        os.replace(tmp, _blob(digest, name)) # readers only ever see complete blobs
+    finally:
+        if r is not None: r.close() # gives back net's per-host slot
+        if os.path.exists(tmp): os.remove(tmp)
+    if not want: _record(name, digest)
+    RUN["fetched"] += 1; RUN["bytes"] += n
+    return _blob(digest, name)
+
+def _valid(name, path):
+    # Blob names are their sha256; rehash once per process to catch on-disk corruption
+    if path in _verified: return True
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""): h.update(block)
+    if h.hexdigest() != os.path.basename(path).split(".")[0]:
+        os.remove(path); return False
+    _verified.add(path)
+    return True
+
+def path(name):
+    # Local path of an asset, downloading it on first use. Concurrent callers share one download.
+    if name in _resolved: return _resolved[name]
+    want = _expected(name)
+    if want and os.path.exists(_blob(want, name)) and _valid(name, _blob(want, name)):
+        RUN["hits"] += 1
+        _resolved[name] = _blob(want, name)
+        return _resolved[name]
+    with _lock:
+        ev = _flights.get(name)
+        leader = ev is None
+        if leader: ev = _flights[name] = threading.Event()
+    if not leader:
+        ev.wait()
+        return path(name)
+    try:
+        p = _resolved[name] = _download(name); _verified.add(p)
+        return p
+    finally:
+        with _lock: _flights.pop(name, None)
+        ev.set()
+
+def prefetch(*names):
+    # Parallel fetch; -> {name: path or None}. Failures are left for the lazy path(name) call to surface.
+    def one(n):
+        try: return path(n)
+        except Exception: return None
+    with ThreadPoolExecutor(max(1, min(6, len(names)))) as ex: return dict(zip(names, ex.map(one, names)))
+
+def pins():
+    # -> {name: sha256} of what the upstream URLs serve now (ignores ASSET_MIRROR and the store), for pasting into CATALOG
+    out = {}
+    for name, (url, _) in CATALOG.items():
+        r = net.get(url, timeout=(5, 60))
+        r.raise_for_status()
+        out[name] = hashlib.sha256(r.content).hexdigest()
+    return out
+
+if __name__ == "__main__":
+    # python assets.py [name ...] -> fetch into the store; python assets.py --pin -> CATALOG lines with upstream sha256s
+    import sys, time
+    if sys.argv[1:] == ["--pin"]:
+        for name, digest in pins().items(): print(f'    "{name}": (..., "{digest}"),')
+        sys.exit(0)
+    t0 = time.perf_counter()
+    got = prefetch(*(sys.argv[1:] or CATALOG))
+    for n, p in got.items(): print(f"{n:12} {p}")
+    print(RUN, f"{time.perf_counter() - t0:.1f}s")
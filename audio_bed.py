@@ -0,0 +1,92 @@
+# audio_bed.py - each music track decoded once to raw PCM on disk; renders cut, speed and mix their segment from the mmap
+import os, time, hashlib, subprocess, threading
+import numpy as np
+import assets
+from encoder import ffmpeg_exe
+
+DIR = os.getenv("AUDIO_BED_DIR", ".cache/audio")
+RATE, CH = 44100, 2 # s16le interleaved, what the encoder is told to expect
+_lock = threading.Lock()
+_beds = {}
+RUN = {"decoded": 0, "decode_s": 0.0, "cut_s": 0.0}
+
+def _digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""): h.update(block)
+    return h.hexdigest()
+
+def bed(path):
+    # -> read-only (samples, 2) int16 memmap of the whole track; decoded by ffmpeg on first use only
+    st = os.stat(path)
+    k = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _lock:
+        if k in _beds: return _beds[k]
+        pcm = os.path.join(DIR, _digest(path) + f".s16le{RATE}")
+        if not os.path.exists(pcm):
+            os.makedirs(DIR, exist_ok=True)
+            tmp = f"{pcm}.{os.getpid()}.part"
+            t0 = time.perf_counter()
+            r = subprocess.run([ffmpeg_exe(), "-y", "-loglevel", "error", "-i", path, "-f", "s16le", "-ac", str(CH), "-ar", str(RATE), tmp], stderr=subprocess.PIPE)
+            if r.returncode != 0 or not os.path.getsize(tmp):
+                if os.path.exists(tmp): os.remove(tmp)
+                raise IOError(f"decode failed: {r.stderr.decode(errors='ignore')[-300:]}")
+            os.replace(tmp, pcm)
+            RUN["decoded"] += 1; RUN["decode_s"] += time.perf_counter() - t0
+        _beds[k] = np.memmap(pcm, dtype=np.int16, mode="r").reshape(-1, CH)
+        return _beds[k]
+
+def segment(path, duration, start=0.0, speed=1.0, volume=1.0, noise=0.0):
+    # Same result as the encoder's ffmpeg chain (asetrate speed-up, volume, summed white noise, apad) without decoding the mp3
+    t0 = time.perf_counter()
+    src = bed(path)
+    n = int(round(duration * RATE))
+    a = int(start * RATE)
+    need = int(np.ceil(n * speed)) + 2
+    raw = np.ascontiguousarray(src[a:a + need]) # only these pages of the mmap are touched
+    if speed != 1.0 and len(raw) > 1:
+        # Linear resample; each stereo frame gathered as one int32, then interpolated in place
+        frames = raw.view(np.int32).ravel()
+        pos = np.arange(n, dtype=np.float64) * speed
+        pos = pos[pos < len(frames) - 1]
+        i = pos.astype(np.int64)
+        cut = frames.take(i).view(np.int16).reshape(-1, CH).astype(np.float32)
+        nxt = frames.take(i + 1).view(np.int16).reshape(-1, CH).astype(np.float32)
+        nxt -= cut; nxt *= (pos - i).astype(np.float32)[:, None]; cut += nxt
+    else: cut = raw.astype(np.float32)
+    out = np.zeros((n, CH), dtype=np.float32)
+    out[:min(n, len(cut))] = cut[:n]
+    if volume != 1.0: out *= volume
+    if noise: out += (np.random.default_rng().random(out.shape, dtype=np.float32) * 2 - 1) * (noise * 32767)
+    seg = np.clip(out, -32768, 32767).astype(np.int16)
+    RUN["cut_s"] += time.perf_counter() - t0
+    return seg
+
+def audio(path, duration, **fx):
+    # -> encoder audio dict carrying ready PCM; falls back to the encoder's own mp3 path if the bed can't be built
+    try: return {"pcm": segment(path, duration, **fx), "rate": RATE, "channels": CH}
+    except Exception: return dict(path=path, duration=duration, **fx)
+
+def track(name, duration, **fx):
+    # audio() for a catalog track by asset name; None (a silent render, as before the asset store) if it can't be fetched
+    try: p = assets.path(name)
+    except Exception: return None
+    return audio(p, duration, **fx)
+
+if __name__ == "__main__":
+    # python audio_bed.py track.mp3 -> audio prep per render: the encoder's mp3 decode + filter chain vs a cut from the bed
+    import sys
+    from encoder import audio_args
+    track, dur, fx = sys.argv[1], 12, {"speed": 1.02, "volume": 0.5, "noise": 0.01}
+    a_in, a_out = audio_args(dict(path=track, duration=dur, **fx), dur)
+    chain = a_out[a_out.index("-filter_complex") + 1].replace("[1:a]", "[0:a]").replace("[2:a]", "[1:a]")
+    cmd = [ffmpeg_exe(), "-loglevel", "error"] + a_in + ["-filter_complex", chain, "-map", "[aout]", "-t", str(dur), "-f", "s16le", "-ac", "2", "-"]
+    t0 = time.perf_counter()
+    for _ in range(5): ref = subprocess.run(cmd, stdout=subprocess.PIPE).stdout
+    t_mp3 = (time.perf_counter() - t0) / 5
+    bed(track)
+    t0 = time.perf_counter()
+    for _ in range(5): seg = segment(track, dur, **fx)
+    t_bed = (time.perf_counter() - t0) / 5
+    print(f"mp3 decode + filters: {t_mp3 * 1000:.0f}ms ({len(ref) // 4} samples) | bed cut: {t_bed * 1000:.0f}ms ({len(seg)} samples)")
+    print(RUN)
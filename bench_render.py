@@ -0,0 +1,153 @@
+# bench_render.py - offline render cost of every skin (fixture image, fixed text, no NewsAPI/Groq/image download); JSON report to diff across commits
+import os, sys, json, time, random, resource, importlib, subprocess, tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OUT = os.getenv("BENCH_OUT", ".cache/bench/render.json")
+FIXTURES = os.getenv("BENCH_FIXTURES", ".cache/bench/fixtures")
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.15")) # worse than the baseline by more than this fraction -> regression
+SEED = 7 # same durations, fps, bitrates, colours and jitter on every run
+# name -> (width, height, format); generated once, byte-identical on every machine with the same Pillow
+IMAGES = {"wire.jpg": (2400, 1600, "JPEG"), "portrait.png": (1200, 1800, "PNG")}
+HEADLINE = "Scientists unveil a battery that charges in five minutes and lasts a decade"
+SUMMARY = "The prototype survived ten thousand cycles in independent tests. Carmakers say the first vehicles could use it within three years."
+ART = {"title": HEADLINE, "url": "https://example.com/story", "urlToImage": "fixture", "source": {"name": "Reuters"}, "description": SUMMARY}
+
+def fixture(name):
+    # Photo-like test card (soft gradients, blobs, grain) so JPEG decode, crop and x264 see realistic content
+    path = os.path.join(FIXTURES, name)
+    if os.path.exists(path): return path
+    import numpy as np
+    from PIL import Image, ImageFilter
+    w, h, fmt = IMAGES[name]
+    rng = np.random.default_rng(SEED)
+    y, x = np.mgrid[0:h, 0:w].astype(np.float32)
+    img = np.stack([x / w * 180 + 40, y / h * 140 + 60, (1 - x / w) * 120 + 80], -1)
+    for _ in range(24):
+        cx, cy, r = rng.uniform(0, w), rng.uniform(0, h), rng.uniform(0.03, 0.2) * w
+        img += (np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (2 * r * r)) * rng.uniform(-90, 90))[..., None] * rng.uniform(0.3, 1, 3)
+    im = Image.fromarray(np.clip(img, 0, 255).astype(np.uint8)).filter(ImageFilter.GaussianBlur(2))
+    arr = np.asarray(im, dtype=np.int16) + rng.integers(-12, 13, (h, w, 1), dtype=np.int16)
+    os.makedirs(FIXTURES, exist_ok=True)
+    Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8)).save(path, fmt, quality=88)
+    return path
+
+def cases(images=("wire.jpg",)):
+    # "bot:layout@image" for every skin each bot can pick; main/newsroom have the one classic layout
+    import ghost_engine, empire_bot, abc_bot
+    out = []
+    for image in images:
+        for bot, skins in (("ghost_engine", ghost_engine.SKINS), ("empire_bot", empire_bot.SKINS), ("abc_bot", abc_bot.SKINS)):
+            out += [f"{bot}:{s}@{image}" for s in dict.fromkeys(skins)]
+        out += [f"main:classic@{image}", f"newsroom:classic@{image}"]
+    return out
+
+def run_case(case):
+    # One render in this (fresh) process -> metrics dict
+    bot, rest = case.split(":"); layout, image = rest.split("@")
+    os.environ.setdefault("SKIN_CACHE_DIR", tempfile.mkdtemp(prefix="bench-skins-")) # cold skin base every case
+    os.environ.setdefault("TRACE_PATH", "") # timings go in the report, not the bots' trace file
+    random.seed(SEED)
+    mod = importlib.import_module(bot)
+    from image_ingest import cover
+    from assets import prefetch, CATALOG
+    from audio_bed import bed
+    data = open(fixture(image), "rb").read()
+    mod.load_image = lambda url, headers=None: (*cover(data), data)
+    for p in prefetch(*CATALOG).values():
+        if p and p.endswith(".mp3"): bed(p) # one-off track decode is not render cost
+    m = {"overlay_ms": 0.0, "compose_s": 0.0}
+
+    skin = mod.render_skin
+    def timed_skin(*a, **kw):
+        t0 = time.perf_counter()
+        try: return skin(*a, **kw)
+        finally: m["overlay_ms"] += (time.perf_counter() - t0) * 1000
+    mod.render_skin = timed_skin
+
+    enc = mod.encode
+    def timed_encode(path, make_frame, duration, fps, **kw):
+        def frame(t):
+            t0 = time.perf_counter()
+            try: return make_frame(t)
+            finally: m["compose_s"] += time.perf_counter() - t0
+        m["enc"] = r = enc(path, frame, duration, fps, **kw)
+        m["fps_out"] = fps
+        return r
+    mod.encode = timed_encode
+
+    t0 = time.perf_counter()
+    if bot in ("ghost_engine", "empire_bot"):
+        out = mod.render_video(ART, {"headline": HEADLINE.upper(), "summary": SUMMARY}, layout)
+    elif bot == "abc_bot": out = mod.render_video(ART, "tech", HEADLINE, SUMMARY, skin=layout)
+    else: out = mod.render_video(ART, "tech", HEADLINE, SUMMARY)
+    total = time.perf_counter() - t0
+    if not out or "enc" not in m: raise RuntimeError(f"{case}: render returned {out!r}")
+    e = m["enc"]
+    os.remove(out)
+    return {"overlay_ms": round(m["overlay_ms"], 1), "frames": e["frames"], "video_fps": m["fps_out"],
+            "fps": round(e["frames"] / e["seconds"], 1), "encode_s": round(e["seconds"], 2), "compose_s": round(m["compose_s"], 2),
+            "render_s": round(total, 2), "bytes": e["bytes"], "kbps": round(e["bytes"] * 8 / 1000 / (e["frames"] / m["fps_out"])),
+            "peak_rss_mb": peak_rss_mb()}
+
+def peak_rss_mb():
+    # VmHWM starts over at exec; ru_maxrss is carried across it and would report the parent's peak
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"): return round(int(line.split()[1]) / 1024, 1)
+    except OSError: pass
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def measure(case):
+    # Each case in its own interpreter so peak RSS and caches belong to that case alone
+    r = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", case], cwd=HERE, capture_output=True, text=True)
+    last = (r.stdout.strip().splitlines() or [""])[-1]
+    if r.returncode != 0 or not last.startswith("{"): return {"error": (r.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(last)
+
+# Metric -> +1 if higher is worse, -1 if lower is worse; (fraction, absolute) changes under which it is noise
+WATCH = {"overlay_ms": (1, 5.0), "encode_s": (1, 0.2), "fps": (-1, 2.0), "peak_rss_mb": (1, 10.0)}
+
+def compare(base, cur, tol=TOLERANCE):
+    # -> list of "case metric old -> new" regressions
+    bad = []
+    for case, new in cur["cases"].items():
+        old = base.get("cases", {}).get(case)
+        if not old or "error" in old: continue
+        if "error" in new: continue # reported on its own
+        for k, (sign, floor) in WATCH.items():
+            a, b = old.get(k), new.get(k)
+            if a is None or b is None or not a: continue
+            if sign * (b - a) > max(tol * abs(a), floor): bad.append(f"{case} {k} {a} -> {b}")
+    return bad
+
+def _commit():
+    try: return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True).stdout.strip() or None
+    except OSError: return None
+
+if __name__ == "__main__":
+    # python bench_render.py [filter ...] [--all-images] [--baseline old.json]
+    #   filter: "ghost_engine", "empire_bot:neon", "@portrait.png" (substring of the case id)
+    args = sys.argv[1:]
+    if args[:1] == ["--case"]:
+        print(json.dumps(run_case(args[1])))
+        sys.exit(0)
+    baseline = args[args.index("--baseline") + 1] if "--baseline" in args else None
+    filters = [a for a in args if not a.startswith("--") and a != baseline]
+    todo = [c for c in cases(tuple(IMAGES) if "--all-images" in args else ("wire.jpg",)) if not filters or any(f in c for f in filters)]
+    for name in dict.fromkeys(c.split("@")[1] for c in todo): fixture(name)
+    report = {"commit": _commit(), "at": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0], "cpus": os.cpu_count(),
+              "motion_quality": os.getenv("MOTION_QUALITY", "balanced"), "seed": SEED, "cases": {}}
+    print(f"{'case':34} {'overlay':>8} {'fps':>6} {'encode':>7} {'compose':>8} {'size':>8} {'rss':>7}")
+    for case in todo:
+        r = report["cases"][case] = measure(case)
+        if "error" in r: print(f"{case:34} ERROR {r['error']}"); continue
+        print(f"{case:34} {r['overlay_ms']:6.0f}ms {r['fps']:6.1f} {r['encode_s']:6.1f}s {r['compose_s']:7.1f}s {r['bytes'] / 1048576:6.1f}MB {r['peak_rss_mb']:5.0f}MB")
+    if os.path.dirname(OUT): os.makedirs(os.path.dirname(OUT), exist_ok=True)
+    with open(OUT, "w") as f: json.dump(report, f, indent=1)
+    print(f"Report: {OUT}")
+    problems = [f"{c}: {r['error']}" for c, r in report["cases"].items() if "error" in r]
+    if baseline:
+        with open(baseline) as f: problems += compare(json.load(f), report)
+    for p in problems: print("FAIL", p)
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,35 @@
+# bench_startup.py - startup cost of every bot from python -X importtime; exits 1 if a deferred client is imported eagerly or a bot is over budget
+import os, sys, subprocess
+
+BOTS = ["main", "newsroom", "abc_bot", "ghost_engine", "empire_bot"]
+# Only needed once there is a story (research, LLM, render, publish) - see lazy.py / llm.client()
+DEFERRED = ("newspaper", "groq", "cloudinary", "googleapiclient", "google.oauth2", "duckduckgo_search", "moviepy")
+BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "600"))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def profile(bot):
+    # -> {module: (self_us, cumulative_us)} for one fresh interpreter importing the bot
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {bot}"], cwd=HERE, capture_output=True, text=True)
+    if r.returncode != 0: raise RuntimeError(f"{bot}: {r.stderr.strip().splitlines()[-1]}")
+    mods = {}
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        try: s, c, name = line[len("import time:"):].split("|")
+        except ValueError: continue
+        if s.strip().isdigit(): mods[name.strip()] = (int(s), int(c))
+    return mods
+
+def report(bot):
+    mods = profile(bot)
+    total = mods[bot][1] / 1000
+    eager = [d for d in DEFERRED if d in mods]
+    top = sorted(((c, m) for m, (_, c) in mods.items() if "." not in m and m != bot), reverse=True)[:5]
+    print(f"{bot:13} {total:7.0f}ms  top: " + ", ".join(f"{m} {c / 1000:.0f}" for c, m in top))
+    problems = [f"{bot}: imports {m} at startup" for m in eager]
+    if total > BUDGET_MS: problems.append(f"{bot}: {total:.0f}ms > {BUDGET_MS:.0f}ms budget")
+    return problems
+
+if __name__ == "__main__":
+    problems = [p for bot in (sys.argv[1:] or BOTS) for p in report(bot)]
+    for p in problems: print("FAIL", p)
+    sys.exit(1 if problems else 0)
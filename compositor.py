@@ -0,0 +1,52 @@
+# compositor.py - blends a static RGBA overlay onto moving frames, touching only non-transparent regions
+import numpy as np
+
+TILE = 32
+
+def div255(x):
+    # round(x / 255) for uint16 x, in place
+    x += 128
+    x += x >> 8
+    x >>= 8
+    return x
+
+class Compositor:
+    def __init__(self, overlay, tile=TILE):
+        ov = np.asarray(overlay.convert("RGBA"))
+        h, w = ov.shape[:2]
+        alpha = ov[..., 3]
+        self.out = np.empty((h, w, 3), dtype=np.uint8)
+        self.copies, self.blends = [], []
+        # Classify tiles once (0 = transparent, 1 = partial, 2 = opaque), then merge
+        # horizontal runs of the same class so each frame only does a few slice ops.
+        for y in range(0, h, tile):
+            band = alpha[y:y+tile]
+            runs, x = [], 0
+            while x < w:
+                cell = band[:, x:x+tile]
+                kind = 0 if not cell.any() else (2 if cell.min() == 255 else 1)
+                if runs and runs[-1][0] == kind and runs[-1][2] == x: runs[-1][2] = min(x + tile, w)
+                else: runs.append([kind, x, min(x + tile, w)])
+                x += tile
+            for kind, x0, x1 in runs:
+                sl = (slice(y, y + band.shape[0]), slice(x0, x1))
+                if kind == 2: self.copies.append((sl, ov[sl][..., :3].copy()))
+                elif kind == 1:
+                    a = alpha[sl].astype(np.uint16)[..., None]
+                    prem = div255(ov[sl][..., :3].astype(np.uint16) * a).astype(np.uint8)
+                    inv = np.broadcast_to(255 - a, prem.shape).copy()
+                    self.blends.append((sl, prem, inv, np.empty(prem.shape, dtype=np.uint16)))
+        area = float(h * w)
+        self.coverage = {"opaque": sum(p.shape[0] * p.shape[1] for _, p in self.copies) / area,
+                         "blend": sum(p.shape[0] * p.shape[1] for _, p, _, _ in self.blends) / area}
+
+    def apply(self, frame):
+        out = self.out
+        np.copyto(out, frame)
+        for sl, px in self.copies: out[sl] = px
+        for sl, prem, inv, buf in self.blends:
+            np.multiply(out[sl], inv, out=buf)
+            div255(buf)
+            buf += prem
+            out[sl] = buf
+        return out
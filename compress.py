@@ -0,0 +1,50 @@
+# compress.py - extractive research compression: drop boilerplate, dedupe, rank by title relevance, pack a token budget
+import os, re, sys, math
+
+BUDGET = int(os.getenv("CONTEXT_TOKENS", "350")) # ~ 1,400 chars; the old cut was 2,500 chars of raw text
+STOP = set("a an the and or but of to in on at for from by with as is are was were be been has have had it its this that these those "
+           "he she they we you i his her their our your not no will would can could says said after over into about than more new".split())
+BOILER = re.compile(r"(sign up|subscribe|newsletter|advertisement|read more|click here|all rights reserved|cookie|follow us|share this|"
+                    r"getty images|image caption|image source|photo:|copyright|terms of (use|service)|privacy policy|listen to this article|"
+                    r"download the app|watch:|related:|^\W*$)", re.I)
+_SPLIT = re.compile(r"(?<=[.!?\"”])\s+(?=[A-Z0-9\"“‘'(])|\n+")
+
+def tokens(text):
+    # Close enough to Llama tokenization for budgeting English (~4 chars/token)
+    return math.ceil(len(text) / 4)
+
+def _words(s):
+    return [w for w in re.findall(r"[a-z0-9]+", s.lower()) if w not in STOP]
+
+def sentences(text):
+    return [s.strip() for s in _SPLIT.split(text) if s and s.strip()]
+
+def compress(sources, title, budget=None):
+    # sources: one text or a list (article body, search snippets...) -> (packed text, report)
+    budget = budget or BUDGET
+    if isinstance(sources, str): sources = [sources]
+    raw = "\n".join(s for s in sources if s)
+    topic = set(_words(title))
+    kept, seen = [], []
+    for pos, s in enumerate(sentences(raw)):
+        ws = _words(s)
+        if len(ws) < 4 or BOILER.search(s): continue
+        wset = set(ws)
+        if any(len(wset & o) / len(wset | o) > 0.7 for o in seen): continue # same fact from another source
+        seen.append(wset)
+        # Title overlap (length-normalized) plus a small lead bias: news puts the key facts first
+        score = len(wset & topic) / math.sqrt(len(wset)) + 0.3 / (1 + pos)
+        kept.append((score, pos, s))
+    picked, used = [], 0
+    for score, pos, s in sorted(kept, key=lambda k: -k[0]):
+        t = tokens(s) + 1
+        if used + t > budget: continue
+        picked.append((pos, s)); used += t
+    out = " ".join(s for _, s in sorted(picked)) or raw[:budget * 4]
+    t_in, t_out = tokens(raw), tokens(out)
+    return out, {"tokens_in": t_in, "tokens_out": t_out, "saved": max(0, t_in - t_out), "sentences": f"{len(picked)}/{len(kept)}"}
+
+if __name__ == "__main__":
+    # python compress.py "Title" < article.txt
+    out, rep = compress(sys.stdin.read(), sys.argv[1] if len(sys.argv) > 1 else "")
+    print(out, "\n", rep)
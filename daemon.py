@@ -0,0 +1,227 @@
+# daemon.py - every bot in one long-lived process on the workflows' cron schedules; fonts, audio beds, HTTP pools and LLM clients stay warm between runs
+import os, re, sys, json, glob, time, signal, threading, importlib
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BOTS = ["main", "newsroom", "abc_bot", "empire_bot", "ghost_engine"]
+WORKFLOWS = os.getenv("DAEMON_WORKFLOWS", ".github/workflows") # crons come from here, so Actions and the daemon never disagree
+ONLY = [b for b in os.getenv("DAEMON_BOTS", "").split(",") if b] # subset of BOTS to host, default all
+PARALLEL = int(os.getenv("DAEMON_PARALLEL", "2")) # different bots at once; one bot never overlaps itself
+HISTORY = os.getenv("DAEMON_HISTORY", ".cache/daemon_runs.jsonl")
+KEEP = int(os.getenv("DAEMON_KEEP", "50")) # runs per bot kept in memory, served, and kept in HISTORY
+PORT = int(os.getenv("DAEMON_PORT", "0")) # GET / (status + history), POST /run/<bot>; off when 0
+
+def log(step, msg):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] ⏱ {step.upper()}: {msg}", flush=True)
+
+# --- 1. SCHEDULE ---
+def _field(spec, lo, hi):
+    # One cron field -> set of values: "*", "*/4", "5", "1-5", "0,30", "10-50/10"
+    out = set()
+    for part in spec.split(","):
+        rng, _, step = part.partition("/")
+        if rng == "*": a, b = lo, hi
+        elif "-" in rng: a, b = map(int, rng.split("-"))
+        else: a = b = int(rng)
+        if step and rng != "*" and "-" not in rng: b = hi # "5/15" = from 5 every 15
+        if a < lo or b > hi: raise ValueError(f"{spec} outside {lo}-{hi}")
+        out.update(range(a, b + 1, int(step or 1)))
+    return out
+
+class Cron:
+    # Standard 5-field cron in UTC, as GitHub Actions runs it
+    def __init__(self, expr):
+        f = expr.split()
+        if len(f) != 5: raise ValueError(f"bad cron: {expr!r}")
+        self.expr = expr
+        self.minute, self.hour, self.dom, self.month = (_field(x, lo, hi) for x, (lo, hi) in zip(f, [(0, 59), (0, 23), (1, 31), (1, 12)]))
+        self.dow = {d % 7 for d in _field(f[4], 0, 7)} # 0 and 7 are both Sunday
+        self.dom_any, self.dow_any = f[2] == "*", f[4] == "*"
+
+    def matches(self, t):
+        dom, dow = t.day in self.dom, (t.weekday() + 1) % 7 in self.dow
+        day = dow if self.dom_any else dom if self.dow_any else dom or dow # both restricted: either one (cron rule)
+        return t.minute in self.minute and t.hour in self.hour and t.month in self.month and day
+
+    def next(self, after):
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if self.matches(t): return t
+            t += timedelta(minutes=1)
+        return None
+
+def schedules(path=WORKFLOWS):
+    # -> {bot: [Cron]} from every workflow that runs `python <bot>.py`
+    jobs = {}
+    for wf in sorted(glob.glob(os.path.join(path, "*.yml"))):
+        with open(wf) as f: text = f.read()
+        crons = [Cron(c) for c in re.findall(r"cron:\s*['\"]([^'\"]+)['\"]", text)]
+        for bot in re.findall(r"run:\s*python\s+(\w+)\.py", text):
+            if bot in BOTS and (not ONLY or bot in ONLY): jobs.setdefault(bot, []).extend(crons)
+    return jobs
+
+# --- 2. JOBS ---
+class Job:
+    def __init__(self, bot, crons):
+        self.bot, self.crons = bot, crons
+        self.flight = threading.Lock() # held from trigger to finish, queued time included
+        self.since = None
+        self.runs = deque(maxlen=KEEP)
+
+    def due(self, t): return any(c.matches(t) for c in self.crons)
+
+    def next(self, after):
+        ts = [t for t in (c.next(after) for c in self.crons) if t]
+        return min(ts) if ts else None
+
+class Daemon:
+    def __init__(self, jobs, parallel=PARALLEL, history=HISTORY):
+        self.jobs = {bot: Job(bot, crons) for bot, crons in jobs.items()}
+        self.slots = threading.BoundedSemaphore(max(1, parallel))
+        self.stop = threading.Event()
+        self.history, self._hlock, self._lines = history, threading.Lock(), 0
+        self.threads = []
+        self._load_history()
+
+    def _load_history(self):
+        # The last KEEP runs per bot survive a restart
+        try:
+            with open(self.history) as f:
+                for line in f:
+                    self._lines += 1
+                    try: rec = json.loads(line)
+                    except ValueError: continue
+                    if rec.get("bot") in self.jobs: self.jobs[rec["bot"]].runs.append(rec)
+        except OSError: pass
+
+    def _record(self, job, rec):
+        rec = dict(bot=job.bot, **rec)
+        job.runs.append(rec)
+        with self._hlock:
+            if os.path.dirname(self.history): os.makedirs(os.path.dirname(self.history), exist_ok=True)
+            with open(self.history, "a") as f: f.write(json.dumps(rec) + "\n")
+            self._lines += 1
+            # Twice what's kept in memory: rewrite HISTORY down to the last KEEP runs per bot
+            if self._lines > 2 * KEEP * len(self.jobs):
+                recs = sorted((r for j in self.jobs.values() for r in list(j.runs)), key=lambda r: r.get("at", ""))
+                with open(self.history + ".tmp", "w") as f: f.writelines(json.dumps(r) + "\n" for r in recs)
+                os.replace(self.history + ".tmp", self.history)
+                self._lines = len(recs)
+        log("DAEMON", f"{job.bot}: {rec['status']}" + (f" ({rec['seconds']}s)" if "seconds" in rec else "") + (f" - {rec['detail']}" if rec.get("detail") else ""))
+
+    def trigger(self, bot, reason="cron"):
+        # Single-flight: if this bot is queued or running, the trigger is recorded as skipped instead of starting a second copy
+        job = self.jobs[bot]
+        if not job.flight.acquire(blocking=False):
+            self._record(job, {"status": "skipped", "reason": reason, "at": _now(), "detail": f"still running since {job.since}"})
+            return None
+        job.since = _now()
+        t = threading.Thread(target=self._run, args=(job, reason), name=f"job-{bot}", daemon=True)
+        t.start()
+        self.threads = [x for x in self.threads if x.is_alive()] + [t]
+        return t
+
+    def _run(self, job, reason):
+        queued = time.perf_counter()
+        try:
+            with self.slots:
+                t0 = time.perf_counter()
+                rec = {"reason": reason, "at": _now(), "waited": round(t0 - queued, 1)}
+                try:
+                    winner = importlib.import_module(job.bot).run()
+                    rec["status"] = "published" if winner else "idle"
+                    if winner: rec["detail"] = str(winner.get("title") if isinstance(winner, dict) else winner)[:120]
+                except (Exception, SystemExit) as e: # a bot blowing up (or calling exit) must not take the others down
+                    rec["status"], rec["detail"] = "error", f"{type(e).__name__}: {e}"[:300]
+                rec["seconds"] = round(time.perf_counter() - t0, 1)
+                self._record(job, rec)
+        finally:
+            job.since = None
+            job.flight.release()
+
+    def warm(self):
+        # Paid once per process instead of once per run: bot modules, and every font/track in the asset store
+        from assets import prefetch, CATALOG
+        t0 = time.perf_counter()
+        for bot in self.jobs: importlib.import_module(bot)
+        got = prefetch(*CATALOG)
+        log("DAEMON", f"Warm in {time.perf_counter() - t0:.1f}s: {len(self.jobs)} bots, {sum(1 for p in got.values() if p)}/{len(got)} assets")
+
+    def serve(self):
+        # Wakes just after each minute boundary and triggers every bot whose cron matches that minute
+        last = None
+        while not self.stop.is_set():
+            now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+            if now != last:
+                for job in self.jobs.values():
+                    if job.due(now): self.trigger(job.bot)
+                last = now
+            self.stop.wait(max(0.5, 60.5 - time.time() % 60))
+
+    def drain(self, timeout=None):
+        for t in list(self.threads): t.join(timeout)
+
+    def status(self):
+        now = datetime.now(timezone.utc)
+        return {bot: {"schedule": [c.expr for c in j.crons], "running_since": j.since,
+                      "next": (lambda t: t.isoformat() if t else None)(j.next(now)), "runs": list(j.runs)}
+                for bot, j in self.jobs.items()}
+
+def _now(): return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+# --- 3. STATUS PORT ---
+def status_server(daemon, port=PORT):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, obj):
+            body = json.dumps(obj, indent=1).encode()
+            self.send_response(code); self.send_header("Content-Type", "application/json"); self.send_header("Content-Length", str(len(body))); self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            bot = self.path.strip("/")
+            st = daemon.status()
+            if not bot: self._send(200, st)
+            elif bot in st: self._send(200, st[bot])
+            else: self._send(404, {"error": f"unknown bot {bot}"})
+
+        def do_POST(self):
+            bot = self.path.strip("/").removeprefix("run/")
+            if bot not in daemon.jobs: return self._send(404, {"error": f"unknown bot {bot}"})
+            started = daemon.trigger(bot, "manual") is not None
+            self._send(202 if started else 409, {"bot": bot, "started": started})
+
+        def log_message(self, *a): pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=srv.serve_forever, name="daemon-status", daemon=True).start()
+    return srv
+
+if __name__ == "__main__":
+    # python daemon.py              -> run forever on the workflow crons
+    # python daemon.py --once [bot] -> run the given bots (default all) now, in one warm process, then exit
+    # python daemon.py --schedule   -> print each bot's crons, next run and last runs
+    args = sys.argv[1:]
+    d = Daemon(schedules())
+    if "--schedule" in args:
+        for bot, s in d.status().items():
+            last = s["runs"][-1] if s["runs"] else {}
+            print(f"{bot:13} {' | '.join(s['schedule']):24} next {s['next']}  last {last.get('status', '-')} {last.get('at', '')}")
+        sys.exit(0)
+    if "--once" in args:
+        bots = [a for a in args if a in BOTS] or list(d.jobs)
+        for bot in bots:
+            if bot not in d.jobs: d.jobs[bot] = Job(bot, [])
+            d.trigger(bot, "once")
+        d.drain()
+        sys.exit(1 if any(d.jobs[b].runs[-1]["status"] == "error" for b in bots) else 0)
+
+    def shutdown(*_):
+        log("DAEMON", "Stopping: no new runs, waiting for the ones in flight")
+        d.stop.set()
+    signal.signal(signal.SIGTERM, shutdown); signal.signal(signal.SIGINT, shutdown)
+    log("DAEMON", f"Hosting {', '.join(f'{b} ({len(j.crons)} cron)' for b, j in d.jobs.items())}, {PARALLEL} at a time")
+    d.warm()
+    if PORT: status_server(d); log("DAEMON", f"Status on http://127.0.0.1:{PORT}/")
+    d.serve()
+    d.drain()
@@ -0,0 +1,231 @@
+# dedup.py - persistent word index over history files for near-duplicate title checks
+import os, sys, math, time, pickle, random, hashlib, difflib, threading, numpy as np
+from collections import defaultdict
+
+CACHE_DIR = os.getenv("DEDUP_CACHE_DIR", ".cache/dedup")
+THRESHOLD = 0.8
+VERSION = 3 # 1 was trigrams with an assumed overlap (missed character-level edits), 2 bigrams with a proven one (~150ms a lookup at 100k)
+SEED_WORDS = 2 # candidates are the titles holding one of the query's rarest known words
+Q = 4 # gram length for the shared-gram count
+_indexes = {}
+_lock = threading.RLock() # daemon bots share a history file (and its index) across threads
+_EMPTY = np.zeros(0, dtype=np.int32)
+# Character histogram buckets: [a-z0-9 ] exact, anything else shares 11 buckets (collisions only loosen the bound)
+_COMMON = "abcdefghijklmnopqrstuvwxyz0123456789 "
+_BUCKETS = len(_COMMON) + 11
+_LUT = np.array([_COMMON.index(chr(c)) if chr(c) in _COMMON else len(_COMMON) + c % 11 for c in range(128)], dtype=np.int64)
+
+def _chars(texts):
+    # -> uint8 (len(texts), _BUCKETS) character counts; a text over 255 chars gets 255 everywhere, i.e. never rejected
+    cp = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    lens = np.array([len(t) for t in texts], dtype=np.int64)
+    code = np.where(cp < 128, _LUT[np.minimum(cp, 127)], len(_COMMON) + cp % 11)
+    h = np.bincount(np.repeat(np.arange(len(texts)), lens) * _BUCKETS + code, minlength=len(texts) * _BUCKETS).reshape(-1, _BUCKETS)
+    h[lens > 255] = 255
+    return h.astype(np.uint8)
+
+def _grams(t):
+    return {t[i:i+Q] for i in range(len(t) - Q + 1)} or {t}
+
+class TitleIndex:
+    def __init__(self):
+        self.titles, self.postings = [], {} # word -> int32 array of title ids
+        self.lens, self.chars = _EMPTY, np.zeros((0, _BUCKETS), dtype=np.uint8) # per title: length, character histogram
+        self.size, self.digest = 0, hashlib.sha1() # bytes of the history file indexed so far
+
+    def feed(self, data):
+        # data: raw bytes appended to the history file since the last feed
+        self.size += len(data)
+        self.digest.update(data)
+        new, added = defaultdict(list), []
+        for l in data.decode("utf-8", "ignore").splitlines():
+            if "|" not in l: continue
+            t = l.split("|")[0].lower()
+            for w in set(t.split()): new[w].append(len(self.titles))
+            self.titles.append(t)
+            added.append(t)
+        self.lens = np.concatenate([self.lens, np.array([len(t) for t in added], dtype=np.int32)])
+        self.chars = np.concatenate([self.chars, _chars(added)])
+        for w, ids in new.items():
+            old = self.postings.get(w)
+            self.postings[w] = np.array(ids, dtype=np.int32) if old is None else np.concatenate([old, np.array(ids, dtype=np.int32)])
+
+    def candidates(self, t, threshold=THRESHOLD):
+        # Yields titles worth a SequenceMatcher, most shared characters first. ratio = 2M/(la+lb) > threshold needs
+        # 2*min(la, lb) > threshold*(la+lb) and that many shared characters (real_quick_ratio / quick_ratio, the latter
+        # from the stored histograms) - both exact. The rest is a heuristic, checked against the old scan in verify():
+        # with SEED_WORDS known words only titles holding one of the rarest are looked at, and they must share all but
+        # Q grams per edit, edits assumed to touch at most (1-threshold)/2 of the shorter title (one char in 10 at 0.8,
+        # half what the threshold allows). Fewer known words (short or garbled titles): every title is scanned.
+        la = len(t)
+        words = sorted((self.postings[w] for w in set(t.split()) if w in self.postings), key=len)
+        seeded = len(words) >= SEED_WORDS
+        ids = np.unique(np.concatenate(words[:SEED_WORDS])) if seeded else np.arange(len(self.titles))
+        lb = self.lens[ids]
+        ids = ids[2 * np.minimum(lb, la) > threshold * (la + lb)]
+        common = np.minimum(self.chars[ids], np.minimum(_chars([t])[0], 255)).sum(1, dtype=np.int64)
+        keep = 2 * common > threshold * (la + self.lens[ids])
+        grams = _grams(t)
+        for i in ids[keep][np.argsort(-common[keep], kind="stable")].tolist():
+            other = self.titles[i]
+            # a gram is shared iff it is a substring of the other title
+            if not seeded or sum(g in other for g in grams) >= min(len(grams), len(other) - Q + 1) - Q * math.ceil(min(la, len(other)) * (1 - threshold) / 2):
+                yield i
+
+    def match(self, title, threshold=THRESHOLD):
+        # Same test as the old scan, SequenceMatcher(None, title, stored).ratio() > threshold, over candidates() only
+        t = title.lower()
+        sm = difflib.SequenceMatcher(None, t)
+        for i in self.candidates(t, threshold):
+            sm.set_seq2(self.titles[i])
+            if sm.ratio() > threshold: return self.titles[i]
+        return None
+
+    def __len__(self): return len(self.titles)
+
+    def __getstate__(self):
+        # hashlib objects don't pickle; the hex digest is stored next to the index and the hasher rebuilt on load.
+        # Postings go out as one flat array: tens of thousands of small arrays pickle ~5x slower.
+        words = list(self.postings)
+        flat = np.concatenate([self.postings[w] for w in words]) if words else _EMPTY
+        ends = np.cumsum([len(self.postings[w]) for w in words], dtype=np.int64)
+        return dict(self.__dict__, digest=None, postings=(words, flat, ends))
+
+    def __setstate__(self, state):
+        words, flat, ends = state["postings"]
+        self.__dict__.update(state, postings=dict(zip(words, np.split(flat, ends[:-1]))))
+
+def _sidecar(path):
+    return os.path.join(CACHE_DIR, os.path.basename(path) + ".idx")
+
+def _load(path):
+    try:
+        with open(_sidecar(path), "rb") as f: v, idx, digest = pickle.load(f)
+        if v != VERSION: return None
+        with open(path, "rb") as f: head = f.read(idx.size)
+        h = hashlib.sha1(head)
+        if len(head) == idx.size and h.hexdigest() == digest:
+            idx.digest = h
+            return idx
+    except: pass
+    return None
+
+def _save(path, idx):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{_sidecar(path)}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f: pickle.dump((VERSION, idx, idx.digest.hexdigest()), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, _sidecar(path))
+    except: pass
+
+def index_for(path):
+    # Loaded once per process (sidecar if its indexed prefix still matches the file), then only the appended tail is read
+    with _lock:
+        idx = _indexes.get(path)
+        try: size = os.path.getsize(path)
+        except OSError: size = 0
+        if idx is None or size < idx.size:
+            idx = (_load(path) if size else None) or TitleIndex()
+            if idx.size > size: idx = TitleIndex()
+            _indexes[path] = idx
+        if size > idx.size:
+            with open(path, "rb") as f:
+                f.seek(idx.size)
+                idx.feed(f.read(size - idx.size))
+            _save(path, idx)
+        return idx
+
+def is_duplicate(title, path, threshold=THRESHOLD):
+    # Under the lock too: another thread's feed() swaps postings and histograms mid-lookup otherwise
+    with _lock: return index_for(path).match(title, threshold) is not None
+
+# --- BENCHMARK (python dedup.py [entries]) ---
+STOP = ["the", "of", "to", "in", "and", "a", "for", "on", "as", "after", "with", "over", "says", "new", "by"]
+
+def _corpus(rnd, n):
+    # Zipf-distributed vocabulary with English letter frequencies + stopwords, roughly headline-shaped
+    letters, lw = "etaoinshrdlcumwfgypbvkjxqz", [12, 9, 8, 7.5, 7, 6.7, 6.3, 6, 5.9, 4.3, 4, 2.8, 2.8, 2.4, 2.4, 2.2, 2, 2, 1.9, 1.5, 1, .8, .15, .15, .1, .07]
+    words = ["".join(rnd.choices(letters, lw, k=rnd.randint(3, 10))) for _ in range(30000)]
+    ww = [1 / (r + 1) for r in range(len(words))]
+    def title():
+        k = rnd.randint(6, 13)
+        return " ".join(rnd.choice(STOP) if rnd.random() < 0.3 else w for w in rnd.choices(words, ww, k=k))
+    return [title() for _ in range(n)], title
+
+def _perturb(rnd, t):
+    w = t.split()
+    for _ in range(rnd.randint(0, 2)):
+        op = rnd.random()
+        if op < 0.4: w.insert(rnd.randrange(len(w) + 1), rnd.choice(STOP))
+        elif op < 0.7 and len(w) > 6: w.pop(rnd.randrange(len(w)))
+        else: w[rnd.randrange(len(w))] = w[rnd.randrange(len(w))][:-1] or "x"
+    return " ".join(w).upper() if rnd.random() < 0.3 else " ".join(w)
+
+def _history(d, titles):
+    path = os.path.join(d, "history.txt")
+    with open(path, "w") as f: f.writelines(f"{t}|https://example.com/{i}\n" for i, t in enumerate(titles))
+    return path
+
+def _typo(rnd, t, chars="abcdefghijklmnopqrstuvwxyz0123456789 "):
+    # Character-level edits: substitutions, insertions, deletions anywhere, spaces included
+    c = list(t)
+    for _ in range(rnd.randint(1, max(1, len(t) // 8))):
+        op, i = rnd.random(), rnd.randrange(len(c) + 1)
+        if op < 0.4 and i < len(c): c[i] = rnd.choice(chars)
+        elif op < 0.7 or i == len(c): c.insert(i, rnd.choice(chars))
+        else: c.pop(i)
+    return "".join(c)
+
+def _queries(rnd, titles, title, n):
+    # Word-level edits, character-level edits and unrelated titles, a third each
+    k = n // 3
+    return [_perturb(rnd, rnd.choice(titles)) for _ in range(k)] + [_typo(rnd, rnd.choice(titles)) for _ in range(k)] + [title() for _ in range(n - 2 * k)]
+
+def verify(n=3000, queries=150, seed=3):
+    # Index answers must equal the old linear SequenceMatcher scan: headline corpus, then short random strings
+    # under character edits (where an overlap heuristic breaks first), e.g. 'v oznriro roam k' vs 'v 7znrir0 roam6k'
+    import tempfile
+    rnd = random.Random(seed)
+    titles, title = _corpus(rnd, n)
+    noise = lambda: "".join(rnd.choices("abcdefghijklmnopqrstuvwxyz0123456789 ", k=rnd.randint(6, 30)))
+    short = ["v oznriro roam k"] + [noise() for _ in range(n - 1)]
+    sets = [(titles, _queries(rnd, titles, title, queries)), (short, ["v 7znrir0 roam6k"] + [_typo(rnd, rnd.choice(short)) for _ in range(queries - 1)])]
+    global CACHE_DIR
+    checked = 0
+    with tempfile.TemporaryDirectory() as d:
+        CACHE_DIR = os.path.join(d, "cache")
+        for hist, qs in sets:
+            _indexes.clear()
+            idx = index_for(_history(d, hist))
+            for q in qs:
+                legacy = any(difflib.SequenceMatcher(None, q.lower(), h).ratio() > THRESHOLD for h in idx.titles)
+                assert (idx.match(q) is not None) == legacy, q
+            checked += len(qs)
+    return checked
+
+def benchmark(n=100000, queries=200, legacy_sample=2000, seed=7):
+    import tempfile
+    rnd = random.Random(seed)
+    titles, title = _corpus(rnd, n)
+    qs = _queries(rnd, titles, title, queries)
+    global CACHE_DIR
+    with tempfile.TemporaryDirectory() as d:
+        CACHE_DIR = os.path.join(d, "cache")
+        hist = _history(d, titles)
+        t0 = time.perf_counter(); idx = index_for(hist); t_build = time.perf_counter() - t0
+        _indexes.clear()
+        t0 = time.perf_counter(); index_for(hist); t_load = time.perf_counter() - t0
+        with open(hist, "a") as f: f.write("brand new headline about markets|https://example.com/new\n")
+        t0 = time.perf_counter(); idx = index_for(hist); t_append = time.perf_counter() - t0
+        t0 = time.perf_counter(); hits = [idx.match(q) is not None for q in qs]; t_q = (time.perf_counter() - t0) / len(qs)
+        # Old scan timed on a slice of history and scaled to the full size
+        t0 = time.perf_counter()
+        for q in qs[:5]:
+            for h in idx.titles[:legacy_sample]: difflib.SequenceMatcher(None, q.lower(), h).ratio()
+        t_legacy = (time.perf_counter() - t0) / 5 * len(idx) / legacy_sample
+    return {"entries": len(idx), "build_s": round(t_build, 2), "load_s": round(t_load, 3), "append_s": round(t_append, 3),
+            "lookup_ms": round(t_q * 1000, 3), "legacy_ms": round(t_legacy * 1000, 1), "dup_rate": round(sum(hits) / len(hits), 2)}
+
+if __name__ == "__main__":
+    print("verified", verify(), "queries against the linear scan")
+    print(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
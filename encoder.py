@@ -0,0 +1,86 @@
+# encoder.py - streams raw RGB frames into a single ffmpeg process (video + audio in one pass)
+import os, time, subprocess, threading, numpy as np
+import spans
+
+def ffmpeg_exe():
+    if os.getenv("FFMPEG_BINARY"): return os.getenv("FFMPEG_BINARY")
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except: return "ffmpeg"
+
+def audio_args(audio, duration):
+    # audio = {"path": mp3, "start": 0, "duration": secs, "speed": 1.0, "volume": 1.0, "noise": 0.0}
+    speed = audio.get("speed", 1.0)
+    src = audio.get("duration", duration) * speed
+    inputs = ["-ss", str(audio.get("start", 0)), "-t", f"{src:.3f}", "-i", audio["path"]]
+    chain = "[1:a]aresample=44100"
+    if speed != 1.0: chain += f",asetrate={44100 * speed:.0f},aresample=44100"
+    if audio.get("volume", 1.0) != 1.0: chain += f",volume={audio['volume']:.5f}"
+    chain += ",apad[music]"
+    if audio.get("noise"):
+        # Noise floor summed on top of the music (amix averages, volume=2 restores the sum)
+        inputs += ["-f", "lavfi", "-i", f"anoisesrc=r=44100:a={audio['noise']}:c=white"]
+        chain += ";[music][2:a]amix=inputs=2:duration=first,volume=2[aout]"
+    else:
+        chain = chain.replace("[music]", "[aout]")
+    return inputs, ["-filter_complex", chain, "-map", "0:v", "-map", "[aout]", "-c:a", "aac", "-ac", "2", "-shortest"]
+
+def pcm_args(audio, fd):
+    # audio = {"pcm": int16 (samples, channels) array, already cut/sped/mixed (audio_bed)}, read from an inherited pipe
+    inputs = ["-f", "s16le", "-ar", str(audio.get("rate", 44100)), "-ac", str(audio.get("channels", 2)), "-i", f"pipe:{fd}"]
+    return inputs, ["-map", "0:v", "-map", "1:a", "-c:a", "aac", "-ac", "2", "-shortest"]
+
+def _feed(fd, data):
+    # Own thread: ffmpeg reads both pipes interleaved, so writing audio after video would deadlock
+    try:
+        with os.fdopen(fd, "wb") as f: f.write(data)
+    except (BrokenPipeError, OSError): pass
+
+def encode(path, make_frame, duration, fps, audio=None, bitrate=None, preset="ultrafast", ffmpeg_params=None, size=(1080, 1920)):
+    w, h = size
+    n = int(round(duration * fps))
+    cmd = [ffmpeg_exe(), "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}", "-r", f"{fps}", "-i", "pipe:0"]
+    tail = ["-map", "0:v"]
+    pcm_r = pcm_w = None
+    if audio and audio.get("pcm") is not None:
+        pcm_r, pcm_w = os.pipe()
+        a_in, tail = pcm_args(audio, pcm_r)
+        cmd += a_in
+    elif audio and os.path.exists(audio["path"]):
+        a_in, tail = audio_args(audio, duration)
+        cmd += a_in
+    cmd += tail + ["-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p"]
+    if bitrate: cmd += ["-b:v", bitrate]
+    cmd += (ffmpeg_params or []) + ["-t", f"{n / fps:.3f}", path]
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE, pass_fds=(pcm_r,) if pcm_r is not None else ())
+    feeder = None
+    if pcm_r is not None:
+        os.close(pcm_r)
+        feeder = threading.Thread(target=_feed, args=(pcm_w, memoryview(np.ascontiguousarray(audio["pcm"])).cast("B")), daemon=True)
+        feeder.start()
+    sent, compose = 0, 0.0
+    try:
+        for i in range(n):
+            t = time.perf_counter()
+            frame = make_frame(i / fps)
+            compose += time.perf_counter() - t
+            if frame.dtype != np.uint8 or not frame.flags.c_contiguous: frame = np.ascontiguousarray(frame, dtype=np.uint8)
+            proc.stdin.write(memoryview(frame).cast("B"))
+            sent += frame.nbytes
+    except BrokenPipeError: pass
+    except:
+        proc.kill(); proc.wait()
+        raise
+    finally:
+        try: proc.stdin.close()
+        except: pass
+    err = proc.stderr.read().decode(errors="ignore")
+    if feeder: feeder.join(5)
+    if proc.wait() != 0: raise IOError(f"ffmpeg failed: {err.strip()[-500:]}")
+    res = {"path": path, "frames": n, "seconds": time.perf_counter() - t0, "bytes_in": sent, "bytes": os.path.getsize(path)}
+    spans.record("render.frames", compose, frames=n) # motion + compositing share of the encode wall time
+    spans.record("render.encode", res["seconds"], frames=n, fps=fps, bytes=res["bytes"])
+    return res
@@ -0,0 +1,94 @@
+# fb_upload.py - streams a video to a Reels upload_url in fixed-size chunks and resumes from the last confirmed byte
+import os, sys, time, requests
+import net, spans
+
+CHUNK = int(os.getenv("FB_UPLOAD_CHUNK", str(4 * 1024 * 1024)))
+RETRIES = int(os.getenv("FB_UPLOAD_RETRIES", "5"))
+
+def fb_status(video_id, token, api="https://graph.facebook.com/v18.0"):
+    # Server-confirmed byte count of an in-progress upload (status.uploading_phase.bytes_transferred)
+    def confirmed():
+        s = net.get(f"{api}/{video_id}", params={"fields": "status", "access_token": token}, timeout=15).json()
+        n = s.get('status', {}).get('uploading_phase', {}).get('bytes_transferred')
+        return int(n) if n is not None else None
+    return confirmed
+
+def upload(path, upload_url, token, status=None, chunk=CHUNK, retries=RETRIES):
+    # status() -> bytes the server has, used to resume after a failed chunk; without it the chunk is resent
+    size = os.path.getsize(path)
+    offset, chunks, resumes, failures, err = 0, 0, 0, 0, None
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        while offset < size:
+            f.seek(offset)
+            data = f.read(min(chunk, size - offset))
+            try:
+                r = net.post(upload_url, headers={"Authorization": f"OAuth {token}", "offset": str(offset), "file_size": str(size)}, data=data, timeout=net.UPLOAD_TIMEOUT)
+                if r.status_code == 200:
+                    offset += len(data); chunks += 1; failures = 0
+                    continue
+                err = f"HTTP {r.status_code}: {r.text[:200]}"
+            except requests.RequestException as e: err = str(e)[:200]
+            failures += 1
+            if failures > retries: break
+            time.sleep(min(8, 0.5 * 2 ** failures))
+            try: confirmed = status() if status else None
+            except Exception: confirmed = None
+            if confirmed is not None and 0 <= confirmed <= size:
+                offset = confirmed; resumes += 1
+    secs = time.perf_counter() - t0
+    spans.record("publish.fb_upload", secs, "ok" if offset >= size else "error", bytes=offset, chunks=chunks, resumes=resumes)
+    return {"ok": offset >= size, "bytes": offset, "size": size, "chunks": chunks, "resumes": resumes, "seconds": round(secs, 2),
+            "mb_s": round(offset / 1048576 / max(secs, 1e-6), 2), "error": None if offset >= size else err}
+
+def format_report(rep):
+    return f"{rep['bytes']}/{rep['size']} bytes in {rep['chunks']} chunks, {rep['resumes']} resumes, {rep['seconds']}s ({rep['mb_s']} MB/s)" + (f" | {rep['error']}" if rep['error'] else "")
+
+# --- LOCAL STAND-IN FOR upload_url (python fb_upload.py [MB]) ---
+def _stand_in(drop_every=3):
+    # Appends POST bodies at the given offset, cuts every drop_every-th request off half way (keeping what arrived),
+    # and answers GET with the Graph-style uploading_phase.bytes_transferred.
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    state = {"data": bytearray(), "posts": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *a): pass
+
+        def do_GET(self):
+            self._json(200, f'{{"status": {{"uploading_phase": {{"status": "in_progress", "bytes_transferred": {len(state["data"])}}}}}}}')
+
+        def do_POST(self):
+            n, off = int(self.headers["Content-Length"]), int(self.headers["offset"])
+            state["posts"] += 1
+            if off != len(state["data"]):
+                self.rfile.read(n)
+                return self._json(400, '{"error": "offset mismatch"}')
+            if drop_every and state["posts"] % drop_every == 0:
+                state["data"] += self.rfile.read(n // 2)
+                self.connection.close() # dropped mid-transfer
+                return
+            state["data"] += self.rfile.read(n)
+            self._json(200, '{"success": true}')
+
+        def _json(self, code, body):
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json"); self.send_header("Content-Length", str(len(body)))
+            self.end_headers(); self.wfile.write(body.encode())
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, state
+
+if __name__ == "__main__":
+    import tempfile, hashlib
+    mb = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    srv, state = _stand_in()
+    url = f"http://127.0.0.1:{srv.server_port}/video-upload/v18.0/123"
+    with tempfile.NamedTemporaryFile(suffix=".mp4") as tmp:
+        tmp.write(os.urandom(int(mb * 1048576))); tmp.flush()
+        rep = upload(tmp.name, url, "token", status=lambda: int(net.get(url).json()["status"]["uploading_phase"]["bytes_transferred"]), chunk=1048576)
+        same = hashlib.sha256(open(tmp.name, "rb").read()).digest() == hashlib.sha256(bytes(state["data"])).digest()
+    srv.shutdown()
+    print(format_report(rep), "| server copy identical:", same)
+    assert rep["ok"] and rep["resumes"] > 0 and same
@@ -0,0 +1,119 @@
+# fonts.py - process-wide font registry + binary-search text fitting
+import sys, time, textwrap
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+
+@lru_cache(maxsize=256)
+def get_font(path, size):
+    return ImageFont.truetype(path, size)
+
+_glyphs = {} # (path, size) -> {char: (advance, top, bottom)}; top/bottom are None for blank glyphs
+
+def _glyph(font, ch):
+    table = _glyphs.setdefault((getattr(font, "path", id(font)), font.size), {})
+    if ch not in table:
+        l, t, r, b = font.getbbox(ch)
+        table[ch] = (font.getlength(ch), t, b) if (r > l and b > t) else (font.getlength(ch), None, None)
+    return table[ch]
+
+def line_box(font, line):
+    # (advance width, top, bottom) from cached per-glyph metrics; top/bottom match draw.textbbox((0,0), line)
+    w, top, bottom = 0.0, None, None
+    for ch in line:
+        adv, t, b = _glyph(font, ch)
+        w += adv
+        if t is not None:
+            top = t if top is None else min(top, t)
+            bottom = b if bottom is None else max(bottom, b)
+    if top is None: _, top, _, bottom = font.getbbox(line)
+    return w, top, bottom
+
+def line_width(font, line):
+    return line_box(font, line)[0]
+
+def _largest(sizes, fits):
+    # sizes are descending; returns the layout of the largest size that fits (text height only grows with size)
+    lo, hi, best = 0, len(sizes) - 1, None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        res = fits(sizes[mid])
+        if res: best, hi = res, mid - 1
+        else: lo = mid + 1
+    return best
+
+# --- FITTERS (same layouts as the old linear loops) ---
+def fit_text(text, max_w, max_h, start_size, path="Anton.ttf", fallback=None):
+    # main/newsroom/abc_bot: shrink by 4pt from start_size until the wrapped block is shorter than max_h;
+    # nothing fits -> fallback() (each bot's old loop had its own), default Anton 25 wrapped at 28
+    def fits(size):
+        font = get_font(path, size)
+        lines = textwrap.wrap(text, width=int(max_w/(size*0.55)))
+        th = 0
+        for l in lines:
+            _, t, b = line_box(font, l)
+            th += b - t + 15
+        return (font, lines) if th < max_h else None
+    return _largest(range(start_size, 25, -4), fits) or (fallback() if fallback else (get_font(path, 25), textwrap.wrap(text, width=28)))
+
+def fit_text_dynamic(text, box_w, path, max_s):
+    # ghost/empire: shrink by 5pt from max_s until sum(line bottoms) * 1.1 < 1000
+    def fits(size):
+        font = get_font(path, size)
+        lines = textwrap.wrap(text, width=int(box_w / (size * 0.5)))
+        return (font, lines) if sum(line_box(font, l)[2] for l in lines) * 1.1 < 1000 else None
+    sizes = range(max_s, 30, -5)
+    last = sizes[-1] - 5 if len(sizes) else max_s
+    return _largest(sizes, fits) or (get_font(path, last), textwrap.wrap(text, width=20))
+
+# --- MICRO-BENCHMARK (python fonts.py [font.ttf]) ---
+def _legacy_fit_text(draw, text, max_w, max_h, start_size, path):
+    size = start_size
+    while size > 25:
+        font = ImageFont.truetype(path, size)
+        lines = textwrap.wrap(text, width=int(max_w/(size*0.55)))
+        th = sum([draw.textbbox((0,0), l, font=font)[3] - draw.textbbox((0,0), l, font=font)[1] + 15 for l in lines])
+        if th < max_h: return font, lines
+        size -= 4
+    return ImageFont.truetype(path, 25), textwrap.wrap(text, width=28)
+
+def _legacy_fit_text_dynamic(draw, text, box_w, path, max_s):
+    size = max_s
+    font = ImageFont.truetype(path, size)
+    while size > 30:
+        lines = textwrap.wrap(text, width=int(box_w / (size * 0.5)))
+        h = sum([draw.textbbox((0,0), l, font=font)[3] for l in lines]) * 1.1
+        if h < 1000: return font, lines
+        size -= 5
+        font = ImageFont.truetype(path, size)
+    return font, textwrap.wrap(text, width=20)
+
+def benchmark(path="Anton.ttf", rounds=20):
+    draw = ImageDraw.Draw(Image.new('RGBA', (1080, 1920)))
+    texts = [
+        "HUGE SHOCK AS CENTRAL BANK SLASHES RATES",
+        "Scientists confirm record-breaking heatwave hit three continents this summer, with ocean temperatures rising faster than any model predicted.",
+        "Tech giant unveils AI chip that doubles performance while cutting power use in half for data centres worldwide, analysts say",
+        "BREAKING",
+    ]
+    cases = [(t, 900, h, s) for t in texts for h, s in ((600, 140), (500, 100), (400, 90), (800, 160))]
+    res = {}
+    for name, legacy, new in (
+        ("fit_text", lambda c: _legacy_fit_text(draw, *c, path), lambda c: fit_text(*c, path=path)),
+        ("fit_text_dynamic", lambda c: _legacy_fit_text_dynamic(draw, c[0], c[1], path, c[3]), lambda c: fit_text_dynamic(c[0], c[1], path, c[3])),
+    ):
+        for c in cases:
+            a, b = legacy(c), new(c)
+            assert (a[0].size, a[1]) == (b[0].size, b[1]), (name, c, a[0].size, b[0].size)
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for c in cases: legacy(c)
+        t1 = time.perf_counter()
+        for _ in range(rounds):
+            for c in cases: new(c)
+        t2 = time.perf_counter()
+        n = rounds * len(cases)
+        res[name] = {"legacy_ms": round((t1 - t0) / n * 1000, 3), "new_ms": round((t2 - t1) / n * 1000, 3), "speedup": round((t1 - t0) / max(t2 - t1, 1e-9), 1)}
+    return res
+
+if __name__ == "__main__":
+    for k, v in benchmark(*sys.argv[1:2]).items(): print(k, v)
@@ -1,20 +1,28 @@
 
-import os, time, requests, textwrap, json, numpy as np, cloudinary, cloudinary.uploader, difflib, re, random, math, io
+import os, time, textwrap, json, numpy as np, re, random, math
 from PIL import Image, ImageDraw, ImageFont, ImageFile, ImageEnhance, ImageOps, ImageFilter, ImageChops
-from moviepy.editor import VideoFileClip, CompositeVideoClip, ImageClip, AudioFileClip, vfx, CompositeAudioClip
-# FIX: Robust Import for AudioArrayClip
-try:
-    from moviepy.audio.AudioClip import AudioArrayClip
-except ImportError:
-    from moviepy.audio.AudioClip import AudioArrayClip as AudioArrayClip
-
-from groq import Groq
 from datetime import datetime, timedelta
-from newspaper import Article
-from duckduckgo_search import DDGS
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from lazy import Lazy
+from motion import MotionEngine, drunk_path
+from encoder import encode
+from audio_bed import track as audio_bed
+from compositor import Compositor
+from render_debug import dump
+from assets import path as asset, prefetch as prefetch_assets
+from image_ingest import load as load_image, format_stats as image_stats
+from skin_cache import gradient_layer
+from fonts import get_font, fit_text_dynamic as fit_dynamic
+from pipeline import run as run_pipeline
+import llm, net
+from compress import compress
+from prefetch import Prefetcher
+from llm_cache import stats as cache_stats, format_stats
+from dedup import is_duplicate
+from publisher import publish_all, format_report
+from fb_upload import upload as fb_upload, fb_status, format_report as upload_report
+import artifact_cache as artifacts
+import spans
+from poller import poll, report as poll_report, ig_container_state, fb_processing_state
 
 # --- CONFIGURATION ---
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
@@ -33,29 +41,28 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_ADMIN_ID = os.getenv("TELEGRAM_ADMIN_ID")
 
 ImageFile.LOAD_TRUNCATED_IMAGES = True
-cloudinary.config(cloud_name=CLOUDINARY_CLOUD_NAME, api_key=CLOUDINARY_API_KEY, api_secret=CLOUDINARY_API_SECRET)
+
+# Heavy clients load on first use, so a run that finds no news never imports them
+DDGS = Lazy("duckduckgo_search", "DDGS")
+Credentials = Lazy("google.oauth2.credentials", "Credentials")
+build = Lazy("googleapiclient.discovery", "build")
+MediaFileUpload = Lazy("googleapiclient.http", "MediaFileUpload")
+
+def _cloudinary(m):
+    import cloudinary.uploader
+    m.config(cloud_name=CLOUDINARY_CLOUD_NAME, api_key=CLOUDINARY_API_KEY, api_secret=CLOUDINARY_API_SECRET)
+
+cloudinary = Lazy("cloudinary", then=_cloudinary)
 
 # --- 1. ASSETS ---
 def log(step, msg): 
     print(f"[{datetime.now().strftime('%H:%M:%S')}] 💎 {step.upper()}: {msg}")
 
+TRACKS = {"news1": "song1.mp3", "news2": "song3.mp3"}
+
 def ensure_assets():
-    os.makedirs('ghost_assets', exist_ok=True)
-    # ONLY PRO FONTS
-    fonts = {
-        "Anton": "https://github.com/google/fonts/raw/main/ofl/anton/Anton-Regular.ttf",
-        "Oswald": "https://github.com/google/fonts/raw/main/ofl/oswald/static/Oswald-Bold.ttf",
-        "Roboto": "https://github.com/google/fonts/raw/main/apache/robotocondensed/static/RobotoCondensed-Bold.ttf"
-    }
-    for n, u in fonts.items():
-        if not os.path.exists(f"ghost_assets/{n}.ttf"): os.system(f"wget -q -O ghost_assets/{n}.ttf {u}")
-    
-    tracks = {
-        "news1": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3",
-        "news2": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-3.mp3"
-    }
-    for n, u in tracks.items():
-        if not os.path.exists(f"ghost_assets/{n}.mp3"): os.system(f"wget -q -O ghost_assets/{n}.mp3 {u}")
+    # ONLY PRO FONTS (audio is fetched lazily, only the track a render picks)
+    prefetch_assets("Anton.ttf", "Oswald.ttf", "Roboto.ttf")
 
 def get_random_agent():
     return random.choice([
@@ -82,12 +89,9 @@ def is_garbage(title):
     t = title.lower()
     block = ["gift", "deal", "buy", "shop", "review", "best of", "opinion", "horoscope"]
     if any(x in t for x in block): return True
-    if not os.path.exists("ghost_history.txt"): return False
-    with open("ghost_history.txt", "r") as f:
-        for l in f:
-            if "|" in l and difflib.SequenceMatcher(None, t, l.split("|")[0].lower()).ratio() > 0.8: return True
-    return False
+    return is_duplicate(t, "ghost_history.txt")
 
+@spans.traced("news")
 def fetch_news():
     log("NEWS", "Scanning premium sources...")
     cands = []
@@ -96,7 +100,7 @@ def fetch_news():
     random.shuffle(sources)
     try:
         url = f"https://newsapi.org/v2/top-headlines?sources={','.join(sources[:5])}&apiKey={NEWS_API_KEY}"
-        r = requests.get(url, headers={"User-Agent": get_random_agent()}, timeout=20).json()
+        r = net.get(url, headers={"User-Agent": get_random_agent()}, timeout=20).json()
         if r.get('status') == 'ok': 
             for a in r['articles']:
                 if a.get('urlToImage') and not is_garbage(a['title']):
@@ -104,31 +108,49 @@ def fetch_news():
     except Exception as e: log("ERR", str(e))
     return cands
 
-def analyze_story(art):
-    client = Groq(api_key=GROQ_API_KEY)
-    model = get_best_groq_model(client)
-    
+@spans.traced("research.search", size=lambda r: sum(len(x) for x in r))
+def search_snippets(art):
+    with DDGS() as ddgs: 
+        return "\n".join([r['body'] for r in (ddgs.text(art['title'], max_results=2) or [])])
+
+research = Prefetcher(search_snippets, key=lambda art: "ddgs") # search-only research: limit is on the search API
+
+@spans.traced("research")
+def research_story(art):
+    found, _ = research.sources(art)
+    ctx, rep = compress(found + [art.get('description')], art['title'])
+    log("RESEARCH", f"Context {rep['tokens_in']} -> {rep['tokens_out']} tokens ({rep['saved']} saved)")
+    return ctx
+
+@spans.traced("llm")
+def analyze_story(art, ctx=None):
     # Research
-    try:
-        with DDGS() as ddgs: 
-            res = ddgs.text(art['title'], max_results=2)
-            ctx = "\n".join([r['body'] for r in res]) if res else art['description']
-    except: ctx = art['description']
+    if ctx is None: ctx = research_story(art)
+
+    # Content Gen (Viral Style) - one structured call
+    story_prompt = (
+        f"Story: {art['title']}\nContext: {ctx}\n"
+        f"Goal: Create a Viral News Short script and its post.\n"
+        f"Output JSON: {{'headline': '4-7 words UPPERCASE SHOCKING', 'summary': '1 short punchy sentence', "
+        f"'caption': 'viral caption, no hashtags', 'deep_dive': '🧠 DEEP DIVE section with 3 key facts', 'hashtags': ['15 hashtags']}}"
+    )
+    d = llm.story(GROQ_API_KEY, get_best_groq_model, story_prompt, llm.story_schema("headline", "summary", "caption", "deep_dive", "hashtags"))
+    if d: return {"headline": d['headline'], "summary": d['summary']}, f"{d['caption']}\n\n{d['deep_dive']}\n\n{llm.hashtag_line(d['hashtags'])}"
+    log("AI", "Structured reply failed validation, using split calls")
 
-    # Content Gen (Viral Style)
     sys_msg = (
         f"Story: {art['title']}\nContext: {ctx}\n"
         f"Goal: Create a Viral News Short script.\n"
         f"Output JSON: {{'headline': '4-7 words UPPERCASE SHOCKING', 'summary': '1 short punchy sentence'}}"
     )
     try:
-        raw = client.chat.completions.create(messages=[{"role":"user","content":sys_msg}], model=model, response_format={"type": "json_object"}).choices[0].message.content
+        raw = llm.complete(GROQ_API_KEY, get_best_groq_model, sys_msg, json_mode=True)
         data = json.loads(raw)
     except: data = {"headline": art['title'][:50], "summary": art['description'][:100]}
     
     # Caption + Deep Dive
     cap_prompt = f"Write a viral caption for: {art['title']}. Include a '🧠 DEEP DIVE' section with 3 key facts. End with 15 hashtags."
-    cap = client.chat.completions.create(messages=[{"role":"user","content":cap_prompt}], model=model).choices[0].message.content.strip()
+    cap = llm.complete(GROQ_API_KEY, get_best_groq_model, cap_prompt).strip()
     
     return data, cap
 
@@ -152,44 +174,45 @@ def apply_visual_genetics(img):
     return img
 
 def fit_text_dynamic(draw, text, box_w, font_name, max_s):
-    size = max_s
-    try: font = ImageFont.truetype(f"ghost_assets/{font_name}.ttf", size)
-    except: font = ImageFont.load_default()
-    while size > 30:
-        lines = textwrap.wrap(text, width=int(box_w / (size * 0.5)))
-        h = sum([draw.textbbox((0,0), l, font=font)[3] for l in lines]) * 1.1
-        if h < 1000: return font, lines
-        size -= 5
-        font = ImageFont.truetype(f"ghost_assets/{font_name}.ttf", size)
-    return font, textwrap.wrap(text, width=20)
-
-def render_skin(data, source_name):
+    try: return fit_dynamic(text, box_w, asset(f"{font_name}.ttf"), max_s)
+    except OSError: return ImageFont.load_default(), textwrap.wrap(text, width=20)
+
+def skin_base(layout, color, source_name, jx, jy):
+    # Background of each skin: the cached gradient, then the jittered source pill / bar drawn per render
+    if layout == "classic":
+        base = gradient_layer(1080, 1920, 920, 240)
+        draw = ImageDraw.Draw(base)
+        font_s = get_font(asset("Anton.ttf"), 30)
+        src_txt = f" {source_name.upper()} "
+        draw.rounded_rectangle([(50+jx, 1050+jy), (50+jx+draw.textlength(src_txt, font_s)+20, 1100+jy)], radius=10, fill="#E63946")
+        draw.text((60+jx, 1058+jy), src_txt, font=font_s, fill="white")
+    else:
+        base = Image.new('RGBA', (1080, 1920), (0,0,0,0))
+        draw = ImageDraw.Draw(base)
+        if layout == "split":
+            draw.rectangle([(0, 1200+jy), (1080, 1920)], fill="black")
+            draw.text((60+jx, 1160+jy), source_name.upper(), font=get_font(asset("Anton.ttf"), 40), fill=color)
+    return base
+
+SKINS = ["classic", "classic", "classic", "poster", "poster", "split"] # weighted: random.choice picks classic half the time
+
+@spans.traced("render.overlay")
+def render_skin(data, source_name, layout=None):
     # ONLY GOOD SKINS. NO BOXED.
-    skins = ["classic", "classic", "classic", "poster", "poster", "split"]
-    layout = random.choice(skins)
+    layout = layout or random.choice(SKINS)
     
     font_name = "Anton"
     colors = ["#E63946", "#FFD700", "#00F0FF", "#FFFFFF", "#FF5733"]
     color = random.choice(colors)
     jx, jy = random.randint(-5, 5), random.randint(-5, 5)
     
-    overlay = Image.new('RGBA', (1080, 1920), (0,0,0,0))
+    overlay = skin_base(layout, color, source_name, jx, jy)
     draw = ImageDraw.Draw(overlay)
     
     log("DESIGN", f"Skin: {layout.upper()}")
 
     if layout == "classic":
         # The BBC/Vice look. Big text bottom.
-        grad = Image.new('L', (1080, 1000), 0)
-        for y in range(1000): ImageDraw.Draw(grad).line([(0,y),(1080,y)], fill=int((y/1000)*255))
-        overlay.paste(Image.new('RGBA', (1080,1000), (0,0,0,240)), (0, 920), mask=grad)
-        
-        # Source Pill
-        font_s = ImageFont.truetype("ghost_assets/Anton.ttf", 30)
-        src_txt = f" {source_name.upper()} "
-        draw.rounded_rectangle([(50+jx, 1050+jy), (50+jx+draw.textlength(src_txt, font_s)+20, 1100+jy)], radius=10, fill="#E63946")
-        draw.text((60+jx, 1058+jy), src_txt, font=font_s, fill="white")
-        
         f, l = fit_text_dynamic(draw, data['headline'], 1000, font_name, 110)
         y = 1150 + jy
         for line in l: draw.text((50+jx, y), line, font=f, fill="white"); y += f.size + 10
@@ -209,80 +232,44 @@ def render_skin(data, source_name):
 
     elif layout == "split":
         # Top/Bottom
-        draw.rectangle([(0, 1200+jy), (1080, 1920)], fill="black")
-        draw.text((60+jx, 1160+jy), source_name.upper(), font=ImageFont.truetype("ghost_assets/Anton.ttf", 40), fill=color)
         f, l = fit_text_dynamic(draw, data['headline'], 900, "Oswald", 100)
         y = 1250 + jy
         for line in l: draw.text((50+jx, y), line, font=f, fill="white"); y += f.size + 10
 
     return overlay
 
-def render_video(art, data):
+@spans.traced("render", size=os.path.getsize)
+def render_video(art, data, layout=None):
     ensure_assets()
     duration = random.uniform(9.0, 13.0)
     
     try:
-        r = requests.get(art['urlToImage'], headers={"User-Agent": get_random_agent()}, timeout=10)
-        if r.status_code != 200: raise Exception("Img DL Failed")
-        try: img = Image.open(io.BytesIO(r.content)).convert("RGB")
-        except: raise Exception("Img Corrupt")
-
-        w, h = img.size
-        tr = 1080/1920
-        if w/h > tr:
-            nw = int(h*tr); left = (w-nw)//2; img = img.crop((left, 0, left+nw, h))
-        else:
-            nh = int(w/tr); top = (h-nh)//2; img = img.crop((0, top, w, top+nh))
-        img = img.resize((1080, 1920), Image.LANCZOS)
+        img, st, raw = load_image(art['urlToImage'], headers={"User-Agent": get_random_agent()})
+        dump("source", raw)
+        log("RENDER", f"Image: {image_stats(st)}")
         
         img = apply_visual_genetics(img) # Stealth + Grade
-        img.save("bg.jpg")
         
         # Drunk Camera
-        clip_bg = ImageClip("bg.jpg").set_duration(duration)
-        w, h = clip_bg.size
         drift_x = random.randint(-15, 15)
-        def drunk_scroll(gf, t):
-            frame = Image.fromarray(gf(t))
-            zoom = 1.05 + (0.05 * math.sin(t * 0.5))
-            new_w, new_h = int(w*zoom), int(h*zoom)
-            frame = frame.resize((new_w, new_h), Image.LANCZOS)
-            cx, cy = new_w//2, new_h//2
-            pan_x = int(drift_x * math.sin(t))
-            left = cx - 540 + pan_x; top = cy - 960
-            if left < 0: left = 0
-            if top < 0: top = 0
-            return np.array(frame.crop((left, top, left+1080, top+1920)))
-        clip_bg = clip_bg.fl(drunk_scroll)
+        dump("background", img)
+        clip_bg = MotionEngine(img, drunk_path(drift_x))
         
-        overlay = render_skin(data, art['source']['name'])
-        overlay.save("ov.png")
-        clip_ui = ImageClip("ov.png").set_duration(duration)
+        overlay = render_skin(data, art['source']['name'], layout)
+        ui = Compositor(overlay)
+        frame = lambda t: ui.apply(clip_bg.frame(t))
+        dump("overlay", overlay); dump("frame0", lambda: frame(0))
         
-        # Audio Biometrics
+        # Audio Biometrics: Pitch Shift + Noise Floor (Stealth)
         track_name = random.choice(["news1", "news2"])
-        if os.path.exists(f"ghost_assets/{track_name}.mp3"):
-            main_audio = AudioFileClip(f"ghost_assets/{track_name}.mp3")
-            if main_audio.duration > duration: main_audio = main_audio.subclip(0, duration)
-            
-            # Pitch Shift
-            main_audio = main_audio.fx(vfx.speedx, random.uniform(0.98, 1.02))
-            
-            # Noise Floor (Stealth)
-            noise_rate = 44100
-            noise_data = np.random.uniform(-0.01, 0.01, (int(duration*noise_rate), 2))
-            noise_audio = AudioArrayClip(noise_data, fps=noise_rate)
-            
-            final_audio = CompositeAudioClip([main_audio, noise_audio])
-            final = CompositeVideoClip([clip_bg, clip_ui]).set_audio(final_audio).set_duration(duration)
-        else:
-            final = CompositeVideoClip([clip_bg, clip_ui]).set_duration(duration)
+        audio = audio_bed(TRACKS[track_name], duration, speed=random.uniform(0.98, 1.02), noise=0.01)
 
         fps = random.choice([29.97, 30.00, 24.00])
         br = str(random.randint(4500, 6000)) + "k"
         out_name = get_thief_filename()
         
-        final.write_videofile(out_name, fps=fps, codec='libx264', audio_codec='aac', bitrate=br, preset="ultrafast", logger=None, ffmpeg_params=["-metadata", "title=", "-metadata", "artist="])
+        enc = encode(out_name, frame, duration, fps, audio=audio, bitrate=br, ffmpeg_params=["-metadata", "title=", "-metadata", "artist="])
+        log("RENDER", f"Encoded {enc['frames']} frames in {enc['seconds']:.1f}s ({enc['bytes']} bytes)")
         return out_name
     except Exception as e:
         raise e 
@@ -291,16 +278,16 @@ def render_video(art, data):
 def post_ig(path, cap):
     if not IG_ACCESS_TOKEN: return False
     try:
-        url = cloudinary.uploader.upload(path, resource_type="video")['secure_url']
-        r1 = requests.post(f"https://graph.facebook.com/v18.0/{IG_USER_ID}/media", data={"media_type": "REELS", "video_url": url, "caption": cap, "access_token": IG_ACCESS_TOKEN}).json()
-        if 'id' in r1:
-            cid = r1['id']
-            for _ in range(25): 
-                time.sleep(5)
-                s = requests.get(f"https://graph.facebook.com/v18.0/{cid}", params={"fields":"status_code", "access_token": IG_ACCESS_TOKEN}).json()
-                if s.get('status_code') == 'FINISHED':
-                    requests.post(f"https://graph.facebook.com/v18.0/{IG_USER_ID}/media_publish", data={"creation_id": cid, "access_token": IG_ACCESS_TOKEN})
-                    return True
+        url = artifacts.remember(path, "cloudinary", lambda: cloudinary.uploader.upload(path, resource_type="video")['secure_url'])
+        scope = (IG_USER_ID, cap)
+        cid = artifacts.remember(path, "ig_container", lambda: net.post(f"https://graph.facebook.com/v18.0/{IG_USER_ID}/media", data={"media_type": "REELS", "video_url": url, "caption": cap, "access_token": IG_ACCESS_TOKEN}).json().get('id'), scope)
+        if cid:
+            st = poll(lambda: ig_container_state(net.get(f"https://graph.facebook.com/v18.0/{cid}", params={"fields":"status_code", "access_token": IG_ACCESS_TOKEN}, timeout=20).json()), "IG", deadline=125)
+            if st['state'] in ("error", "published"): artifacts.drop(path, "ig_container", scope)
+            if st['ok']:
+                artifacts.drop(path, "ig_container", scope) # used up whether media_publish succeeds, returns no id or raises
+                net.post(f"https://graph.facebook.com/v18.0/{IG_USER_ID}/media_publish", data={"creation_id": cid, "access_token": IG_ACCESS_TOKEN})
+                return True
         return False
     except: return False
 
@@ -308,29 +295,30 @@ def post_fb(path, cap):
     if not FB_ACCESS_TOKEN: return False
     try:
         log("FB", "Uploading...")
-        # 1. Init
-        init = requests.post(f"https://graph.facebook.com/v18.0/{FB_PAGE_ID}/video_reels", data={"upload_phase":"start", "access_token": FB_ACCESS_TOKEN}).json()
-        vid_id = init.get('video_id')
-        up_url = init.get('upload_url')
-        if not vid_id: return False
-        
-        # 2. Upload Bytes (ABC_BOT Method)
-        file_size = os.path.getsize(path)
-        with open(path, 'rb') as f:
-            requests.post(up_url, headers={"Authorization": f"OAuth {FB_ACCESS_TOKEN}", "offset": "0", "file_size": str(file_size)}, data=f.read())
+        vid_id = artifacts.get(path, "fb_video", FB_PAGE_ID)
+        if not vid_id:
+            # 1. Init
+            init = net.post(f"https://graph.facebook.com/v18.0/{FB_PAGE_ID}/video_reels", data={"upload_phase":"start", "access_token": FB_ACCESS_TOKEN}).json()
+            vid_id = init.get('video_id')
+            up_url = init.get('upload_url')
+            if not vid_id: return False
+            
+            # 2. Upload Bytes (chunked, resumable)
+            up = fb_upload(path, up_url, FB_ACCESS_TOKEN, status=fb_status(vid_id, FB_ACCESS_TOKEN))
+            log("FB", f"Upload: {upload_report(up)}")
+            if not up['ok']: return False
+            artifacts.put(path, "fb_video", vid_id, FB_PAGE_ID)
         
         # 3. Smart Polling (My Fix)
         log("FB", "Polling status...")
-        for _ in range(36): # 6 Mins max
-            time.sleep(10)
-            stat = requests.get(f"https://graph.facebook.com/v18.0/{vid_id}", params={"fields":"status", "access_token": FB_ACCESS_TOKEN}).json()
-            
-            proc_stat = stat.get('status', {}).get('processing_phase', {}).get('status')
-            
-            if proc_stat == 'complete':
-                log("FB", "Ready. Publishing...")
-                fin = requests.post(f"https://graph.facebook.com/v18.0/{FB_PAGE_ID}/video_reels", data={"upload_phase":"finish", "video_id": vid_id, "video_state":"PUBLISHED", "description": cap, "access_token": FB_ACCESS_TOKEN}).json()
-                return fin.get('success', False)
+        st = poll(lambda: fb_processing_state(net.get(f"https://graph.facebook.com/v18.0/{vid_id}", params={"fields":"status", "access_token": FB_ACCESS_TOKEN}, timeout=20).json()), "FB", deadline=360) # 6 Mins max
+        log("FB", f"Processing {st['state']} after {st['seconds']}s ({st['polls']} polls)")
+        if st['state'] == "error": artifacts.drop(path, "fb_video", FB_PAGE_ID)
+        if st['ok']:
+            log("FB", "Ready. Publishing...")
+            fin = net.post(f"https://graph.facebook.com/v18.0/{FB_PAGE_ID}/video_reels", data={"upload_phase":"finish", "video_id": vid_id, "video_state":"PUBLISHED", "description": cap, "access_token": FB_ACCESS_TOKEN}).json()
+            if fin.get('success'): artifacts.drop(path, "fb_video", FB_PAGE_ID)
+            return fin.get('success', False)
                 
         return False
     except: return False
@@ -347,38 +335,51 @@ def post_yt(path, title, desc):
 
 def send_telegram(msg):
     if TELEGRAM_BOT_TOKEN and TELEGRAM_ADMIN_ID:
-        try: requests.post(f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage", data={"chat_id": TELEGRAM_ADMIN_ID, "text": msg})
+        try: net.post(f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage", data={"chat_id": TELEGRAM_ADMIN_ID, "text": msg})
         except: pass
 
-if __name__ == "__main__":
-    ensure_assets()
+def finish_candidate(target, story):
+    log("TRY", f"Rendering: {target['title'][:30]}...")
+    data, cap = story
+    video_path = render_video(target, data)
+    
+    if video_path and os.path.exists(video_path):
+        rep = publish_all({"IG": (post_ig, video_path, cap), "FB": (post_fb, video_path, cap), "YT": (post_yt, video_path, data['headline'], cap)})
+        ig, fb, yt = rep["IG"]["ok"], rep["FB"]["ok"], rep["YT"]["ok"]
+        log("PUBLISH", format_report(rep))
+        
+        status_msg = f"💎 Posted: {data['headline']}\nIG:{ig} FB:{fb} YT:{yt}"
+        log("SUCCESS", status_msg)
+        send_telegram(f"{status_msg}\n⏱ {spans.breakdown()}")
+        
+        with open("ghost_history.txt", "a") as f: f.write(f"{target['title']}|{target['url']}|{datetime.now()}\n")
+        try: os.remove(video_path) # random name per render: nothing overwrites it, and daemon.py keeps one dir for weeks
+        except OSError: pass
+        return True # Success
+    log("WARN", "Render failed. Next...")
+    return False
+
+@spans.scoped("ghost_engine")
+def run():
+    # One pass, see main.run(). -> the published story or None
     log("SYS", "Titan V21 Online")
     
     news_list = fetch_news()
     if not news_list:
         log("SYS", "No news found.")
-        exit(0)
+        return None
     
-    # THE IMMORTAL LOOP
-    for i, target in enumerate(news_list):
-        log("TRY", f"Attempt {i+1}: {target['title'][:30]}...")
-        try:
-            data, cap = analyze_story(target)
-            video_path = render_video(target, data)
-            
-            if video_path and os.path.exists(video_path):
-                ig = post_ig(video_path, cap)
-                fb = post_fb(video_path, cap)
-                yt = post_yt(video_path, data['headline'], cap)
-                
-                status_msg = f"💎 Posted: {data['headline']}\nIG:{ig} FB:{fb} YT:{yt}"
-                log("SUCCESS", status_msg)
-                send_telegram(status_msg)
-                
-                with open("ghost_history.txt", "a") as f: f.write(f"{target['title']}|{target['url']}|{datetime.now()}\n")
-                break # Success
-            else:
-                log("WARN", "Render failed. Next...")
-        except Exception as e:
-            log("SKIP", f"Error: {str(e)}. Next...")
-            continue
+    ensure_assets() # only once there is something to render
+    # THE IMMORTAL LOOP (research + LLM for the next stories run while this one renders)
+    research.start(news_list)
+    stages = [("research", lambda art, _: research_story(art)), ("llm", analyze_story)]
+    try: winner = run_pipeline(news_list, stages, finish_candidate, on_error=lambda art, e: log("SKIP", f"Error: {str(e)}. Next..."))
+    finally: research.close()
+    log("AI", f"LLM cache: {format_stats(cache_stats())}")
+    log("PUBLISH", f"Artifact cache: {artifacts.RUN}")
+    log("PUBLISH", f"Processing times: {poll_report()}")
+    log("TIMING", spans.breakdown())
+    return winner
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,25 @@
+# lazy.py - stand-ins for heavy modules/classes that import on first use, so a run that finds no news never loads them
+import importlib, threading
+
+class Lazy:
+    # Lazy("newspaper", "Article") behaves like the class; Lazy("cloudinary", then=setup) like the module, setup(module) run once
+    def __init__(self, module, attr=None, then=None):
+        self._spec = (module, attr, then)
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    module, attr, then = self._spec
+                    m = importlib.import_module(module)
+                    if then: then(m)
+                    self._obj = getattr(m, attr) if attr else m
+        return self._obj
+
+    def __getattr__(self, name): return getattr(self._load(), name)
+
+    def __call__(self, *a, **kw): return self._load()(*a, **kw)
+
+    def __repr__(self): return f"<lazy {self._spec[0]}{'.' + self._spec[1] if self._spec[1] else ''}{'' if self._obj is None else ' (loaded)'}>"
@@ -0,0 +1,96 @@
+# llm.py - one Groq client per process (keep-alive), cached model choice, single structured call per story
+import os, time, json, threading
+from llm_cache import cached, drop
+from spans import span
+
+MODEL_TTL = int(os.getenv("GROQ_MODEL_TTL", "3600")) # seconds a models.list() pick stays valid
+MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile") # every bot picker's fallback; names cache entries until a pick is made
+_clients, _models = {}, {}
+_lock = threading.Lock()
+
+# Everything the bots need for one story; "hashtags" is kept separate so each bot can place them itself
+STORY_SCHEMA = {
+    "type": "object",
+    "required": ["mood", "headline", "summary", "caption", "hashtags", "deep_dive"],
+    "properties": {
+        "mood": {"type": "string", "enum": ["CRISIS", "TECH", "GENERAL"]},
+        "headline": {"type": "string", "minLength": 8},
+        "summary": {"type": "string", "minLength": 20},
+        "caption": {"type": "string", "minLength": 40},
+        "hashtags": {"type": "array", "items": {"type": "string", "minLength": 2}, "minItems": 5},
+        "deep_dive": {"type": "string", "minLength": 100},
+    },
+}
+
+def story_schema(*fields):
+    # STORY_SCHEMA cut down to the given fields, for bots that don't use all of them
+    return dict(STORY_SCHEMA, required=list(fields), properties={k: STORY_SCHEMA["properties"][k] for k in fields})
+
+def client(api_key):
+    with _lock:
+        if api_key not in _clients:
+            from groq import Groq # ~0.2s of imports, only paid once there is a story to write
+            _clients[api_key] = Groq(api_key=api_key)
+        return _clients[api_key]
+
+def _picked(api_key, pick):
+    hit = _models.get((api_key, pick.__module__, pick.__name__))
+    return hit[0] if hit and hit[1] > time.monotonic() else None
+
+def model(api_key, pick):
+    # pick(client) is the bot's own model picker; its answer is reused for MODEL_TTL seconds
+    m = _picked(api_key, pick)
+    if m: return m
+    m = pick(client(api_key))
+    _models[(api_key, pick.__module__, pick.__name__)] = (m, time.monotonic() + MODEL_TTL)
+    return m
+
+def cache_model(api_key, pick):
+    # Model name the cache is keyed by, known without a round trip: this process's pick, else MODEL
+    return _picked(api_key, pick) or MODEL
+
+def complete(api_key, pick, prompt, json_mode=False):
+    # Every completion goes through the on-disk cache (llm_cache), keyed by model + prompt.
+    # The lookup comes first, so a hit costs no Groq import and no models.list(); the picker only runs on a miss
+    kw = {"response_format": {"type": "json_object"}} if json_mode else {}
+    def call():
+        m = model(api_key, pick)
+        with span("llm.groq", model=m) as s: # cache hits never get here
+            text = client(api_key).chat.completions.create(messages=[{"role": "user", "content": prompt}], model=m, **kw).choices[0].message.content
+            s.set(bytes=len(text or ""))
+            return text
+    return cached(cache_model(api_key, pick), prompt, call, json_mode)
+
+# --- VALIDATION (the JSON-schema subset STORY_SCHEMA uses) ---
+_TYPES = {"object": dict, "string": str, "array": list}
+
+def validate(data, schema, path="$"):
+    # -> list of problems, empty when data matches. enum is compared case-insensitively.
+    t = schema.get("type")
+    if t and not isinstance(data, _TYPES[t]): return [f"{path}: expected {t}"]
+    errs = []
+    if t == "object":
+        errs += [f"{path}.{k}: missing" for k in schema.get("required", []) if k not in data]
+        for k, sub in schema.get("properties", {}).items():
+            if k in data: errs += validate(data[k], sub, f"{path}.{k}")
+    elif t == "string":
+        if len(data.strip()) < schema.get("minLength", 0): errs.append(f"{path}: too short")
+        if "enum" in schema and data.strip().upper() not in schema["enum"]: errs.append(f"{path}: not in {schema['enum']}")
+    elif t == "array":
+        if len(data) < schema.get("minItems", 0): errs.append(f"{path}: too few items")
+        for i, v in enumerate(data): errs += validate(v, schema.get("items", {}), f"{path}[{i}]")
+    return errs
+
+def story(api_key, pick, prompt, schema=STORY_SCHEMA):
+    # One JSON completion for the whole story -> dict, or None when the call fails or the reply doesn't validate
+    prompt = f"{prompt}\nJSON schema: {json.dumps(schema)}"
+    try: data = json.loads(complete(api_key, pick, prompt, json_mode=True))
+    except Exception: data = None
+    if data is None or validate(data, schema):
+        try: drop(cache_model(api_key, pick), prompt, json_mode=True) # don't replay a bad reply from the cache
+        except Exception: pass
+        return None
+    return {k: v.strip() if isinstance(v, str) else v for k, v in data.items()}
+
+def hashtag_line(tags):
+    return " ".join("#" + str(t).strip().lstrip("#").replace(" ", "") for t in tags)
@@ -0,0 +1,85 @@
+# llm_cache.py - on-disk completion cache keyed by model + normalized prompt (SQLite), shared by all bots
+import os, re, time, sqlite3, hashlib, threading
+
+PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm.sqlite")
+TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+_lock = threading.Lock()
+_db = None
+RUN = {"hits": 0, "misses": 0, "saved_s": 0.0} # this process only; the stats table keeps the all-time totals
+
+def _conn():
+    global _db
+    if _db is None:
+        if os.path.dirname(PATH): os.makedirs(os.path.dirname(PATH), exist_ok=True)
+        _db = sqlite3.connect(PATH, timeout=10, check_same_thread=False, isolation_level=None)
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, model TEXT, response TEXT, latency REAL, created REAL, used REAL, bytes INTEGER)")
+        _db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value REAL)")
+    return _db
+
+def key(model, prompt, json_mode=False):
+    # Prompts differing only in whitespace hit the same entry
+    norm = re.sub(r"\s+", " ", prompt).strip()
+    return hashlib.sha256(f"{model}\0{int(json_mode)}\0{norm}".encode()).hexdigest()
+
+def _bump(db, name, by):
+    db.execute("INSERT INTO stats VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, by))
+
+def get(model, prompt, json_mode=False):
+    k, now = key(model, prompt, json_mode), time.time()
+    with _lock:
+        db = _conn()
+        row = db.execute("SELECT response, latency FROM entries WHERE key = ? AND created > ?", (k, now - TTL)).fetchone()
+        if row is None:
+            _bump(db, "misses", 1)
+            RUN["misses"] += 1
+            return None
+        db.execute("UPDATE entries SET used = ? WHERE key = ?", (now, k))
+        _bump(db, "hits", 1); _bump(db, "saved_s", row[1])
+        RUN["hits"] += 1; RUN["saved_s"] += row[1]
+        return row[0]
+
+def put(model, prompt, response, latency, json_mode=False):
+    if not response: return # None/empty content: nothing worth replaying, and get() couldn't tell it from a miss
+    now, size = time.time(), len(response.encode())
+    with _lock:
+        db = _conn()
+        db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", (key(model, prompt, json_mode), model, response, latency, now, now, size))
+        db.execute("DELETE FROM entries WHERE created <= ?", (now - TTL,))
+        # Size bound: drop least recently used entries until under MAX_BYTES
+        total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total > MAX_BYTES:
+            for k, b in db.execute("SELECT key, bytes FROM entries ORDER BY used").fetchall():
+                if total <= MAX_BYTES: break
+                db.execute("DELETE FROM entries WHERE key = ?", (k,))
+                total -= b
+
+def drop(model, prompt, json_mode=False):
+    with _lock: _conn().execute("DELETE FROM entries WHERE key = ?", (key(model, prompt, json_mode),))
+
+def cached(model, prompt, call, json_mode=False):
+    # call() -> completion text; only runs on a miss. A broken cache never blocks the call itself.
+    try: hit = get(model, prompt, json_mode)
+    except sqlite3.Error: hit = None
+    if hit is not None: return hit
+    t0 = time.perf_counter()
+    res = call()
+    try: put(model, prompt, res, time.perf_counter() - t0, json_mode)
+    except sqlite3.Error: pass
+    return res
+
+def stats():
+    with _lock:
+        db = _conn()
+        s = dict(db.execute("SELECT name, value FROM stats").fetchall())
+        n, b = db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+    return {"hits": int(s.get("hits", 0)), "misses": int(s.get("misses", 0)), "saved_s": round(s.get("saved_s", 0), 1), "entries": n, "bytes": b,
+            "run": dict(RUN, saved_s=round(RUN["saved_s"], 1))}
+
+def format_stats(s):
+    r = s["run"]
+    return f"run {r['hits']} hits / {r['misses']} misses, {r['saved_s']}s saved | all-time {s['hits']}/{s['misses']}, {s['saved_s']}s saved, {s['entries']} entries ({s['bytes'] // 1024} KB)"
+
+if __name__ == "__main__":
+    print(stats())
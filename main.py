@@ -1,16 +1,43 @@
-import os, time, requests, textwrap, json, numpy as np, cloudinary, cloudinary.uploader, config_empire as config, difflib
+import os, time, textwrap, json, numpy as np, config_empire as config
 from PIL import Image, ImageDraw, ImageFont, ImageFile
-from moviepy.editor import VideoFileClip, CompositeVideoClip, ImageClip, AudioFileClip
-from groq import Groq
 from datetime import datetime
-from newspaper import Article
-from duckduckgo_search import DDGS
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from lazy import Lazy
+from motion import MotionEngine, zoom_path
+from encoder import encode
+from audio_bed import track as audio_bed
+from compositor import Compositor
+from render_debug import dump
+from assets import path as asset, prefetch as prefetch_assets
+from image_ingest import load as load_image, format_stats as image_stats
+from skin_cache import gradient_layer
+from fonts import get_font, fit_text as fit_lines
+from pipeline import run as run_pipeline
+import llm, net
+from compress import compress
+from prefetch import Prefetcher
+from article_cache import fetch as fetch_cached, RUN as article_stats
+from llm_cache import stats as cache_stats, format_stats
+from dedup import is_duplicate
+from publisher import publish_all, format_report
+from fb_upload import upload as fb_upload, fb_status, format_report as upload_report
+import artifact_cache as artifacts
+import spans
+from poller import poll, report as poll_report, ig_container_state, fb_finish_state
 
 ImageFile.LOAD_TRUNCATED_IMAGES = True
-cloudinary.config(cloud_name=config.CLOUDINARY_CLOUD_NAME, api_key=config.CLOUDINARY_API_KEY, api_secret=config.CLOUDINARY_API_SECRET)
+
+# Heavy clients load on first use, so a run that finds no news never imports them
+Article = Lazy("newspaper", "Article")
+DDGS = Lazy("duckduckgo_search", "DDGS")
+Credentials = Lazy("google.oauth2.credentials", "Credentials")
+build = Lazy("googleapiclient.discovery", "build")
+MediaFileUpload = Lazy("googleapiclient.http", "MediaFileUpload")
+
+def _cloudinary(m):
+    import cloudinary.uploader
+    m.config(cloud_name=config.CLOUDINARY_CLOUD_NAME, api_key=config.CLOUDINARY_API_KEY, api_secret=config.CLOUDINARY_API_SECRET)
+
+cloudinary = Lazy("cloudinary", then=_cloudinary)
 
 # --- 1. SETUP & ASSETS ---
 # ELITE SOURCES ONLY (Quality > Quantity)
@@ -24,11 +51,8 @@ def log(step, msg):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] 🔹 {step.upper()}: {msg}")
 
 def ensure_assets():
-    os.makedirs('assets/audio', exist_ok=True)
-    tracks = {"crisis": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3", "tech": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-2.mp3", "general": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-3.mp3"}
-    for n, u in tracks.items():
-        if not os.path.exists(f"assets/audio/{n}.mp3"): os.system(f"wget -q -O assets/audio/{n}.mp3 {u}")
-    if not os.path.exists("Anton.ttf"): os.system("wget -q -O Anton.ttf https://github.com/google/fonts/raw/main/ofl/anton/Anton-Regular.ttf")
+    # Fonts up front (every render needs them); the mood track is fetched lazily by render_video
+    prefetch_assets("Anton.ttf")
 
 # --- 2. INTELLIGENCE (ENGAGING MODE) ---
 def get_best_groq_model(client):
@@ -43,34 +67,58 @@ def is_garbage(title):
     t = title.lower()
     ads = ["gift guide", "buying guide", "deals", "save $", "shop", "top picks", "review", "best of"]
     if any(x in t for x in ads): return True
-    if not os.path.exists("history_v2.txt"): return False
-    with open("history_v2.txt", "r") as f:
-        for l in f:
-            if "|" in l and difflib.SequenceMatcher(None, t, l.split("|")[0].lower()).ratio() > 0.8: return True
-    return False
+    return is_duplicate(t, "history_v2.txt")
 
+@spans.traced("news")
 def fetch_news():
     log("NEWS", "Sourcing from Elite List...")
     cands = []
     try:
-        r = requests.get(f"https://newsapi.org/v2/top-headlines?sources={','.join(PREMIUM_SOURCES)}&apiKey={config.NEWS_API_KEY}", timeout=15).json()
+        r = net.get(f"https://newsapi.org/v2/top-headlines?sources={','.join(PREMIUM_SOURCES)}&apiKey={config.NEWS_API_KEY}", timeout=15).json()
         if r.get('status') == 'ok': cands.extend([a for a in r['articles'] if a.get('urlToImage') and not is_garbage(a['title'])])
     except: pass
     return cands[:15]
 
+def extract_text(url, html):
+    art = Article(url); art.download(input_html=html); art.parse()
+    return art.text
+
+@spans.traced("research.article", size=len)
+def fetch_article(article):
+    # Cached across runs: repeat headlines skip the download (or get a 304) and the parse
+    text = fetch_cached(article['url'], extract_text)
+    return text if text and len(text) > 500 else None
+
+@spans.traced("research.search", size=lambda r: sum(len(x) for x in r))
+def search_snippets(article):
+    with DDGS() as ddgs: return [r['body'] for r in ddgs.text(article['title'], max_results=3)]
+
+research = Prefetcher(fetch_article, search_snippets)
+
+@spans.traced("research", size=len)
 def perform_research(article):
     log("RESEARCH", f"Scanning: {article['title']}")
-    try:
-        art = Article(article['url']); art.download(); art.parse()
-        if len(art.text) > 500: return art.text[:2500]
-    except: pass
-    try:
-        with DDGS() as ddgs: return "\n".join([r['body'] for r in ddgs.text(article['title'], max_results=3)])
-    except: return article.get('description', '')
+    found, origin = research.sources(article)
+    ctx, rep = compress(found + [article.get('description')], article['title'])
+    log("RESEARCH", f"Context from {origin}: {rep['tokens_in']} -> {rep['tokens_out']} tokens ({rep['saved']} saved, {rep['sentences']} sentences)")
+    return ctx
 
+@spans.traced("llm")
 def generate_content(art, ctx):
-    client = Groq(api_key=config.GROQ_API_KEY)
-    model = get_best_groq_model(client)
+    # 0. Everything in one structured call
+    story_prompt = (
+        f"Analyze this news: {art['title']}\nContext: {ctx}\n"
+        f"Goal: Create a SCRIPT for a viral short video and its post.\n"
+        f"Return JSON: {{\"mood\": \"CRISIS/TECH/GENERAL\", "
+        f"\"headline\": \"5-8 words. PUNCHY, SHOCKING, HIGH IMPACT.\", "
+        f"\"summary\": \"EXACTLY 20-25 words. HIGH ENERGY FACTS. No filler.\", "
+        f"\"caption\": \"Viral News Anchor style: 1. A shocking Hook question. 2. Three quick bullet points. 3. A debate question. No hashtags.\", "
+        f"\"hashtags\": [\"exactly 15: 10 Specific/Niche (e.g. #SpaceX) and 5 Broad/Viral (e.g. #fyp #breakingnews)\"], "
+        f"\"deep_dive\": \"250 words starting with '🧠 DEEP DIVE:'. Tone: Informative but casual/fun.\"}}"
+    )
+    d = llm.story(config.GROQ_API_KEY, get_best_groq_model, story_prompt)
+    if d: return d['mood'], d['headline'], d['summary'], f"{d['caption'][:1800]}\n\n{llm.hashtag_line(d['hashtags'])}", d['deep_dive']
+    log("AI", "Structured reply failed validation, using split calls")
     
     # 1. Video Data - VIRAL HOOKS
     v_prompt = (
@@ -80,7 +128,7 @@ def generate_content(art, ctx):
         f"\"headline\": \"5-8 words. PUNCHY, SHOCKING, HIGH IMPACT.\", "
         f"\"summary\": \"EXACTLY 20-25 words. HIGH ENERGY FACTS. No filler.\"}}"
     )
-    v_data = json.loads(client.chat.completions.create(messages=[{"role":"user","content":v_prompt}], model=model, response_format={"type": "json_object"}).choices[0].message.content)
+    v_data = json.loads(llm.complete(config.GROQ_API_KEY, get_best_groq_model, v_prompt, json_mode=True))
     
     # 2. Caption + SMART HASHTAGS
     cap_prompt = (
@@ -92,76 +140,75 @@ def generate_content(art, ctx):
         f"- 5 Broad/Viral tags (e.g. #fyp #breakingnews)\n"
         f"Limit total response to 2000 chars."
     )
-    caption = client.chat.completions.create(messages=[{"role":"user","content":cap_prompt}], model=model).choices[0].message.content.strip()
+    caption = llm.complete(config.GROQ_API_KEY, get_best_groq_model, cap_prompt).strip()
     
     # 3. Deep Dive
     div_prompt = f"250-word deep dive starting with '🧠 DEEP DIVE:' for: {art['title']}\nContext: {ctx}. Tone: Informative but casual/fun."
-    comment = client.chat.completions.create(messages=[{"role":"user","content":div_prompt}], model=model).choices[0].message.content.strip()
+    comment = llm.complete(config.GROQ_API_KEY, get_best_groq_model, div_prompt).strip()
     
     return v_data['mood'], v_data['headline'], v_data['summary'], caption, comment
 
 # --- 3. RENDERER ---
 def fit_text(draw, text, max_w, max_h, start_size):
-    size = start_size
-    while size > 25:
-        font = ImageFont.truetype("Anton.ttf", size)
-        lines = textwrap.wrap(text, width=int(max_w/(size*0.55)))
-        th = sum([draw.textbbox((0,0), l, font=font)[3] - draw.textbbox((0,0), l, font=font)[1] + 15 for l in lines])
-        if th < max_h: return font, lines
-        size -= 4
-    return ImageFont.truetype("Anton.ttf", 25), textwrap.wrap(text, width=28)
+    return fit_lines(text, max_w, max_h, start_size, asset("Anton.ttf"))
+
+def classic_base(W, H, color, sn):
+    # Cached bottom gradient + source pill drawn per render
+    base = gradient_layer(W, H, int(H*0.45), 240)
+    draw = ImageDraw.Draw(base)
+    f_s = get_font(asset("Anton.ttf"), 35)
+    draw.rounded_rectangle([(60,150), (60+draw.textlength(sn, f_s)+20, 210)], 12, fill=color)
+    draw.text((70,160), sn, font=f_s, fill="black")
+    return base
+
+@spans.traced("render.overlay")
+def render_skin(hl, summ, sn, color):
+    # Overlay for one story: classic base (gradient, source tag) + headline and summary
+    W, H = 1080, 1920
+    overlay = classic_base(W, H, color, sn)
+    draw = ImageDraw.Draw(overlay)
+
+    cy = 600
+    f_h, h_l = fit_text(draw, hl.upper(), 900, 600, 140)
+    for l in h_l:
+        draw.text((65, cy+5), l, font=f_h, fill="black")
+        draw.text((60, cy), l, font=f_h, fill=color)
+        cy += f_h.size + 15
 
+    SAFE_LIMIT = 1500
+    f_u, s_l = fit_text(draw, summ, 900, SAFE_LIMIT-cy, 100)
+    cy += 30
+    for l in s_l:
+        if cy > SAFE_LIMIT: break
+        draw.text((60, cy), l, font=f_u, fill="white")
+        cy += f_u.size + 12
+    return overlay
+
+OUTPUT = "final_main.mp4" # per bot: main, newsroom and abc_bot share one working dir under daemon.py
+
+@spans.traced("render", size=os.path.getsize)
 def render_video(art, mood, hl, summ):
     ensure_assets()
-    cfg = {"crisis": {"c": "#FF0000", "a": "assets/audio/crisis.mp3"}, "tech": {"c": "#00F0FF", "a": "assets/audio/tech.mp3"}, "general": {"c": "#FFD700", "a": "assets/audio/general.mp3"}}.get(mood.lower(), {"c": "#FFD700", "a": "assets/audio/general.mp3"})
+    cfg = {"crisis": {"c": "#FF0000", "a": "song1.mp3"}, "tech": {"c": "#00F0FF", "a": "song2.mp3"}, "general": {"c": "#FFD700", "a": "song3.mp3"}}.get(mood.lower(), {"c": "#FFD700", "a": "song3.mp3"})
     
     try:
-        r = requests.get(art['urlToImage'], timeout=15)
-        if r.status_code != 200 or len(r.content) < 1000: raise Exception("Invalid Image")
-        with open("bg.jpg", "wb") as f: f.write(r.content)
-        Image.open("bg.jpg").verify()
+        # Capped streaming download, decoded near target size and already cropped to 1080x1920
+        img, st, raw = load_image(art['urlToImage'])
+        dump("source", raw)
+        log("RENDER", f"Image: {image_stats(st)}")
     except Exception as e: return None
 
     try:
-        W, H = 1080, 1920
-        overlay = Image.new('RGBA', (W, H), (0,0,0,0))
-        draw = ImageDraw.Draw(overlay)
-        grad = Image.new('L', (W, H), 0)
-        for y in range(int(H*0.45), H): ImageDraw.Draw(grad).line([(0,y),(W,y)], fill=int((y-H*0.45)/(H*0.55)*255))
-        overlay.paste(Image.new('RGBA',(W,H),(0,0,0,240)), (0,0), mask=grad)
-        
-        f_s = ImageFont.truetype("Anton.ttf", 35)
         sn = f" {art['source']['name'].upper()} "
-        draw.rounded_rectangle([(60,150), (60+draw.textlength(sn, f_s)+20, 210)], 12, fill=cfg["c"])
-        draw.text((70,160), sn, font=f_s, fill="black")
-        
-        cy = 600
-        f_h, h_l = fit_text(draw, hl.upper(), 900, 600, 140)
-        for l in h_l:
-            draw.text((65, cy+5), l, font=f_h, fill="black")
-            draw.text((60, cy), l, font=f_h, fill=cfg["c"])
-            cy += f_h.size + 15
-        
-        SAFE_LIMIT = 1500
-        f_u, s_l = fit_text(draw, summ, 900, SAFE_LIMIT-cy, 100)
-        cy += 30
-        for l in s_l:
-            if cy > SAFE_LIMIT: break
-            draw.text((60, cy), l, font=f_u, fill="white")
-            cy += f_u.size + 12
-            
-        overlay.save("overlay.png")
-        img = Image.open("bg.jpg").convert("RGB")
-        bw, bh = img.size; ratio = 1080/1920
-        if bw/bh > ratio: nw = bh * ratio; img = img.crop(((bw-nw)/2, 0, (bw+nw)/2, bh))
-        else: nh = bw/ratio; img = img.crop((0, (bh-nh)/2, bw, (bh-nh)/2 + nh))
-        img.resize((1080, 1920), Image.LANCZOS).save("temp_bg.jpg")
-        
-        clip = ImageClip("temp_bg.jpg").set_duration(6).fl(lambda gf, t: np.array(Image.fromarray(gf(t)).resize([int(d*(1+0.04*t)) for d in Image.fromarray(gf(t)).size], Image.BILINEAR).crop((0,0,1080,1920))))
-        final = CompositeVideoClip([clip, ImageClip("overlay.png").set_duration(6)])
-        if os.path.exists(cfg["a"]): final = final.set_audio(AudioFileClip(cfg["a"]).subclip(0,6))
-        final.write_videofile("final.mp4", fps=24, codec='libx264', audio_codec='aac', preset='ultrafast', logger=None)
-        return "final.mp4"
+        overlay = render_skin(hl, summ, sn, cfg["c"])
+        dump("background", img)
+        clip = MotionEngine(img, zoom_path(0.04))
+        ui = Compositor(overlay)
+        frame = lambda t: ui.apply(clip.frame(t))
+        dump("overlay", overlay); dump("frame0", lambda: frame(0))
+        enc = encode(OUTPUT, frame, 6, 24, audio=audio_bed(cfg["a"], 6))
+        log("RENDER", f"Encoded {enc['frames']} frames in {enc['seconds']:.1f}s ({enc['bytes']} bytes)")
+        return OUTPUT
     except: return None
 
 # --- 4. PLATFORM POSTING ---
@@ -169,28 +216,34 @@ def render_video(art, mood, hl, summ):
 def send_telegram(msg):
     try:
         if config.TELEGRAM_BOT_TOKEN and config.TELEGRAM_ADMIN_ID:
-            requests.post(f"https://api.telegram.org/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage", 
+            net.post(f"https://api.telegram.org/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage", 
                           data={"chat_id": config.TELEGRAM_ADMIN_ID, "text": msg})
     except: pass
 
 def post_instagram(path, cap, comm):
     log("INSTA", "Posting with OLD Token...")
     try:
-        up = cloudinary.uploader.upload(path, resource_type="video")
-        r = requests.post(f"https://graph.facebook.com/v18.0/{config.IG_USER_ID}/media", data={"media_type": "REELS", "video_url": up['secure_url'], "caption": cap, "access_token": config.IG_ACCESS_TOKEN}).json()
-        if 'id' in r:
-            cid = r['id']
-            log("INSTA_DEBUG", f"Container Created: {cid}")
-            for _ in range(15):
-                time.sleep(10)
-                s = requests.get(f"https://graph.facebook.com/v18.0/{cid}", params={"fields":"status_code", "access_token": config.IG_ACCESS_TOKEN}).json()
-                if s.get('status_code') == 'FINISHED':
-                    p = requests.post(f"https://graph.facebook.com/v18.0/{config.IG_USER_ID}/media_publish", data={"creation_id": cid, "access_token": config.IG_ACCESS_TOKEN}).json()
-                    if 'id' in p:
-                        log("INSTA_SUCCESS", f"Published ID: {p['id']}")
-                        time.sleep(5)
-                        requests.post(f"https://graph.facebook.com/v18.0/{p['id']}/comments", data={"message": comm, "access_token": config.IG_ACCESS_TOKEN})
-                        return True
+        # Same render -> same Cloudinary URL and container, so a retry skips the re-upload
+        url = artifacts.remember(path, "cloudinary", lambda: cloudinary.uploader.upload(path, resource_type="video")['secure_url'])
+        scope = (config.IG_USER_ID, cap)
+        r = {}
+        def create():
+            r.update(net.post(f"https://graph.facebook.com/v18.0/{config.IG_USER_ID}/media", data={"media_type": "REELS", "video_url": url, "caption": cap, "access_token": config.IG_ACCESS_TOKEN}).json())
+            return r.get('id')
+        cid = artifacts.remember(path, "ig_container", create, scope)
+        if cid:
+            log("INSTA_DEBUG", f"Container {'Created' if r else 'Reused'}: {cid}")
+            st = poll(lambda: ig_container_state(net.get(f"https://graph.facebook.com/v18.0/{cid}", params={"fields":"status_code", "access_token": config.IG_ACCESS_TOKEN}, timeout=20).json()), "IG", deadline=150)
+            log("INSTA_DEBUG", f"Container {st['state']} after {st['seconds']}s ({st['polls']} polls)")
+            if st['state'] in ("error", "published"): artifacts.drop(path, "ig_container", scope)
+            if st['ok']:
+                artifacts.drop(path, "ig_container", scope) # used up whether media_publish succeeds, returns no id or raises
+                p = net.post(f"https://graph.facebook.com/v18.0/{config.IG_USER_ID}/media_publish", data={"creation_id": cid, "access_token": config.IG_ACCESS_TOKEN}).json()
+                if 'id' in p:
+                    log("INSTA_SUCCESS", f"Published ID: {p['id']}")
+                    time.sleep(5)
+                    net.post(f"https://graph.facebook.com/v18.0/{p['id']}/comments", data={"message": comm, "access_token": config.IG_ACCESS_TOKEN})
+                    return True
         log("INSTA_FAIL", f"Raw Response: {r}")
         return False
     except Exception as e:
@@ -201,45 +254,36 @@ def post_facebook(path, cap, deep_dive):
     log("FB", f"Posting to New Page ID: {config.FB_PAGE_ID}...")
     full_desc = f"{cap}\n\n---\n{deep_dive}"
     try:
-        # 1. Start Upload Session
-        init = requests.post(f"https://graph.facebook.com/v18.0/{config.FB_PAGE_ID}/video_reels", data={"upload_phase": "start", "access_token": config.FB_ACCESS_TOKEN}).json()
-        if 'video_id' not in init: 
-            log("FB_INIT_FAIL", f"Could not start upload. Response: {init}")
-            return False
-        
-        vid_id = init['video_id']
-        upload_url = init['upload_url']
-        log("FB_DEBUG", f"Video ID Reserved: {vid_id}")
-        
-        # 2. Upload Bytes (STRICT BINARY MODE)
-        file_size = os.path.getsize(path)
-        with open(path, 'rb') as f:
-            video_data = f.read()
-            
-        upload_res = requests.post(
-            upload_url,
-            headers={
-                "Authorization": f"OAuth {config.FB_ACCESS_TOKEN}",
-                "offset": "0",
-                "file_size": str(file_size)
-            },
-            data=video_data 
-        )
-        
-        if upload_res.status_code != 200:
-            log("FB_UPLOAD_FAIL", f"Status: {upload_res.status_code} | Error: {upload_res.text}")
-            return False
+        vid_id = artifacts.get(path, "fb_video", config.FB_PAGE_ID)
+        if vid_id:
+            log("FB_DEBUG", f"Reusing uploaded video {vid_id}")
         else:
-            log("FB_UPLOAD_SUCCESS", "Binary chunks transferred.")
+            # 1. Start Upload Session
+            init = net.post(f"https://graph.facebook.com/v18.0/{config.FB_PAGE_ID}/video_reels", data={"upload_phase": "start", "access_token": config.FB_ACCESS_TOKEN}).json()
+            if 'video_id' not in init: 
+                log("FB_INIT_FAIL", f"Could not start upload. Response: {init}")
+                return False
+            
+            vid_id = init['video_id']
+            upload_url = init['upload_url']
+            log("FB_DEBUG", f"Video ID Reserved: {vid_id}")
+            
+            # 2. Upload Bytes (chunked from disk, resumes from the server's confirmed offset)
+            up = fb_upload(path, upload_url, config.FB_ACCESS_TOKEN, status=fb_status(vid_id, config.FB_ACCESS_TOKEN))
+            if not up['ok']:
+                log("FB_UPLOAD_FAIL", upload_report(up))
+                return False
+            else:
+                log("FB_UPLOAD_SUCCESS", upload_report(up))
+                artifacts.put(path, "fb_video", vid_id, config.FB_PAGE_ID)
 
-        # --- SAFE WAIT ---
-        log("FB_DEBUG", "Waiting 30s for processing...")
-        time.sleep(30)
-        
-        # 3. Publish
-        fin = requests.post(f"https://graph.facebook.com/v18.0/{config.FB_PAGE_ID}/video_reels", data={"upload_phase": "finish", "video_id": vid_id, "video_state": "PUBLISHED", "description": full_desc[:5000], "access_token": config.FB_ACCESS_TOKEN}).json()
+        # 3. Publish (retried with backoff until the upload is processed, instead of a blind 30s wait)
+        st = poll(lambda: fb_finish_state(net.post(f"https://graph.facebook.com/v18.0/{config.FB_PAGE_ID}/video_reels", data={"upload_phase": "finish", "video_id": vid_id, "video_state": "PUBLISHED", "description": full_desc[:5000], "access_token": config.FB_ACCESS_TOKEN}, timeout=30).json()), "FB", deadline=120, first=5)
+        fin = st['value']
+        log("FB_DEBUG", f"Finish {st['state']} after {st['seconds']}s ({st['polls']} attempts)")
+        if st['state'] != "timeout": artifacts.drop(path, "fb_video", config.FB_PAGE_ID) # published or rejected, either way used up
         
-        if 'success' in fin and fin['success']:
+        if st['ok']:
             log("FB_SUCCESS", "Video Published Successfully.")
             return True
         else:
@@ -275,36 +319,52 @@ def post_youtube(path, title, deep_dive):
         return False
 
 # --- 5. EXECUTION LOOP ---
-if __name__ == "__main__":
-    ensure_assets()
+def finish_candidate(art, content):
+    # Runs in the main thread while research/LLM for the next candidates continues in the pipeline
+    log("BOT", f"Candidate: {art['title']}")
+    m, h, s, cp, cm = content
+    v = render_video(art, m, h, s)
+    if v:
+        # POST EVERYWHERE (1 Run = 1 Post on All Platforms, all at once)
+        rep = publish_all({"IG": (post_instagram, v, cp, cm), "FB": (post_facebook, v, cp, cm), "YT": (post_youtube, v, h + " #shorts", cm)})
+        ig, fb, yt = rep["IG"]["ok"], rep["FB"]["ok"], rep["YT"]["ok"]
+        log("PUBLISH", format_report(rep))
+        
+        # TELEGRAM REPORT
+        status_msg = f"📰 *Empire Bot Update*\n\nTitle: {art['title']}\n\n✅ IG: {ig}\n✅ FB: {fb}\n✅ YT: {yt}\n\n⏱ {spans.breakdown()}"
+        send_telegram(status_msg)
+        
+        if ig or fb or yt:
+            with open("history_v2.txt", "a") as f: f.write(f"{art['title']}|{art['url']}\n")
+            log("FINAL_STATUS", f"IG:{ig} | FB:{fb} | YT:{yt}")
+            return True
+        else: log("WARN", "All Uploads Failed.")
+    else: log("WARN", "Render Failed.")
+    return False
+
+@spans.scoped("main")
+def run():
+    # One pass: fetch, research/write, render and post until a candidate is published. -> the published article or None
     log("BOT", "Empire Engine V3 Running...")
     
     # Simple logic: If the bot is running, it tries to post EVERYWHERE.
-    # The limit is controlled by the GitHub Schedule (Cron), not this script.
+    # The limit is controlled by the GitHub Schedule (Cron) or daemon.py, not this script.
     
     cands = fetch_news()
-    if not cands: log("BOT", "No News.")
-    else:
-        for i, art in enumerate(cands):
-            log("BOT", f"Candidate #{i+1}: {art['title']}")
-            try:
-                ctx = perform_research(art)
-                m, h, s, cp, cm = generate_content(art, ctx)
-                v = render_video(art, m, h, s)
-                if v:
-                    # POST EVERYWHERE (1 Run = 1 Post on All Platforms)
-                    ig = post_instagram(v, cp, cm)
-                    fb = post_facebook(v, cp, cm)
-                    yt = post_youtube(v, h + " #shorts", cm)
-                    
-                    # TELEGRAM REPORT
-                    status_msg = f"📰 *Empire Bot Update*\n\nTitle: {art['title']}\n\n✅ IG: {ig}\n✅ FB: {fb}\n✅ YT: {yt}"
-                    send_telegram(status_msg)
-                    
-                    if ig or fb or yt:
-                        with open("history_v2.txt", "a") as f: f.write(f"{art['title']}|{art['url']}\n")
-                        log("FINAL_STATUS", f"IG:{ig} | FB:{fb} | YT:{yt}")
-                        break
-                    else: log("WARN", "All Uploads Failed.")
-                else: log("WARN", "Render Failed.")
-            except Exception as e: log("ERROR", e)
+    if not cands:
+        log("BOT", "No News.")
+        return None
+    ensure_assets() # only once there is something to render
+    research.start(cands) # every candidate's article downloads while the first one is processed
+    stages = [("research", lambda art, _: perform_research(art)), ("llm", generate_content)]
+    try: winner = run_pipeline(cands, stages, finish_candidate, on_error=lambda art, e: log("ERROR", e))
+    finally: research.close()
+    log("RESEARCH", f"Article cache: {article_stats}")
+    log("AI", f"LLM cache: {format_stats(cache_stats())}")
+    log("PUBLISH", f"Artifact cache: {artifacts.RUN}")
+    log("PUBLISH", f"Processing times: {poll_report()}")
+    log("TIMING", spans.breakdown())
+    return winner
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,85 @@
+# motion.py - shared Ken Burns / drunk-camera engine
+import os, math, time, numpy as np
+from PIL import Image
+
+W, H = 1080, 1920
+
+# Quality tiers (pick with MOTION_QUALITY env var):
+#   fast     - nearest-neighbour gather from a 2x oversampled source (pure NumPy)
+#   balanced - one fused crop+resize per frame, BILINEAR
+#   hq       - one fused crop+resize per frame, LANCZOS
+TIERS = ("fast", "balanced", "hq")
+DEFAULT_QUALITY = os.getenv("MOTION_QUALITY", "balanced")
+
+# --- CAMERA PATHS ---
+# A path maps t -> (left, top, right, bottom) in source pixels; that box is scaled to fill the frame.
+def zoom_path(rate):
+    # main/newsroom: frame grows by `rate` per second, cropped from the top-left corner
+    return lambda t: (0.0, 0.0, W / (1 + rate * t), H / (1 + rate * t))
+
+def stretch_path(px_per_s):
+    # abc_bot: width grows by `px_per_s` per second, height fixed, cropped from the top-left corner
+    return lambda t: (0.0, 0.0, W * W / (W + px_per_s * t), float(H))
+
+def drunk_path(drift_x):
+    # ghost/empire: breathing zoom around the centre with a sideways sway
+    def box(t):
+        zoom = 1.05 + (0.05 * math.sin(t * 0.5))
+        left = max(0, int(W * zoom) // 2 - 540 + int(drift_x * math.sin(t)))
+        top = max(0, int(H * zoom) // 2 - 960)
+        return (left / zoom, top / zoom, (left + W) / zoom, (top + H) / zoom)
+    return box
+
+# --- ENGINE ---
+class MotionEngine:
+    def __init__(self, img, path, quality=None):
+        self.quality = quality or DEFAULT_QUALITY
+        if self.quality not in TIERS: self.quality = "balanced"
+        self.path = path
+        self.src = img.convert("RGB")
+        if self.src.size != (W, H): self.src = self.src.resize((W, H), Image.LANCZOS)
+        self.frames, self.busy = 0, 0.0
+        if self.quality == "fast":
+            # Oversample once so the per-frame nearest gather has half-pixel precision
+            self.os = 2
+            self.big = np.asarray(self.src.resize((W * self.os, H * self.os), Image.LANCZOS))
+            self.rows = np.empty((H, W * self.os, 3), dtype=np.uint8)
+            self.out = np.empty((H, W, 3), dtype=np.uint8)
+            self.gx, self.gy = np.arange(W) + 0.5, np.arange(H) + 0.5
+        else:
+            self.filter = Image.BILINEAR if self.quality == "balanced" else Image.LANCZOS
+
+    def frame(self, t):
+        t0 = time.perf_counter()
+        l, tp, r, b = self.path(t)
+        r, b = min(r, W), min(b, H)
+        if self.quality == "fast":
+            s = self.os
+            xs = np.clip(((l + self.gx * (r - l) / W) * s).astype(np.intp), 0, W * s - 1)
+            ys = np.clip(((tp + self.gy * (b - tp) / H) * s).astype(np.intp), 0, H * s - 1)
+            np.take(self.big, ys, axis=0, out=self.rows)
+            np.take(self.rows, xs, axis=1, out=self.out)
+            res = self.out
+        else:
+            res = np.asarray(self.src.resize((W, H), self.filter, box=(l, tp, r, b)))
+        self.busy += time.perf_counter() - t0
+        self.frames += 1
+        return res
+
+    @property
+    def fps(self):
+        return self.frames / self.busy if self.busy else 0.0
+
+def benchmark(seconds=3, fps=24, img=None):
+    img = img or Image.fromarray(np.random.randint(0, 255, (H, W, 3), dtype=np.uint8))
+    n = int(seconds * fps)
+    res = {}
+    for q in TIERS:
+        for name, path in (("zoom", zoom_path(0.04)), ("stretch", stretch_path(10)), ("drunk", drunk_path(15))):
+            eng = MotionEngine(img, path, q)
+            for i in range(n): eng.frame(i / fps)
+            res[f"{q}/{name}"] = round(eng.fps, 1)
+    return res
+
+if __name__ == "__main__":
+    for k, v in benchmark().items(): print(f"{k:18s} {v:7.1f} fps")
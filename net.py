@@ -0,0 +1,61 @@
+# net.py - one pooled requests.Session for every outbound call: keep-alive, default timeouts, retries, per-host limits
+import os, weakref, threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+TIMEOUT = (float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")), float(os.getenv("HTTP_READ_TIMEOUT", "30"))) # (connect, read)
+UPLOAD_TIMEOUT = (TIMEOUT[0], 300) # large request bodies (FB upload_url)
+HOST_LIMIT = int(os.getenv("HTTP_HOST_LIMIT", "4")) # concurrent requests per host
+# Only idempotent methods are retried; POSTs (container create, publish, finish) are never replayed here
+RETRY = Retry(total=3, connect=3, read=2, status=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+              allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]), respect_retry_after_header=True, raise_on_status=False)
+_session, _sems = None, {}
+_lock = threading.Lock()
+
+def session():
+    global _session
+    with _lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=HOST_LIMIT, max_retries=RETRY)
+            s.mount("https://", adapter); s.mount("http://", adapter)
+            _session = s
+        return _session
+
+def _host_slot(url):
+    host = urlsplit(url).hostname or ""
+    with _lock:
+        if host not in _sems: _sems[host] = threading.BoundedSemaphore(HOST_LIMIT)
+        return _sems[host]
+
+def _once(fn):
+    done = threading.Lock()
+    def run():
+        if done.acquire(blocking=False): fn()
+    return run
+
+def request(method, url, **kw):
+    kw.setdefault("timeout", TIMEOUT)
+    slot = _host_slot(url)
+    slot.acquire()
+    try: r = session().request(method, url, **kw)
+    except:
+        slot.release()
+        raise
+    if not kw.get("stream"):
+        slot.release()
+        return r
+    # stream=True: the body is still on the wire, so the slot is held until the response is closed (or collected)
+    release, close = _once(slot.release), r.close
+    def closing():
+        try: close()
+        finally: release()
+    r.close = closing # also what `with r:` calls
+    weakref.finalize(r, release)
+    return r
+
+def get(url, **kw): return request("GET", url, **kw)
+
+def post(url, **kw): return request("POST", url, **kw)
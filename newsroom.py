@@ -1,14 +1,39 @@
 # newsroom.py
-import os, time, requests, textwrap, json, numpy as np, cloudinary, cloudinary.uploader, config_v2 as config, difflib
+import os, time, textwrap, json, numpy as np, config_v2 as config
 from PIL import Image, ImageDraw, ImageFont, ImageFile, UnidentifiedImageError
-from moviepy.editor import VideoFileClip, CompositeVideoClip, ImageClip, AudioFileClip
-from groq import Groq
 from datetime import datetime
-from newspaper import Article
-from duckduckgo_search import DDGS
+from lazy import Lazy
+from motion import MotionEngine, zoom_path
+from encoder import encode
+from audio_bed import track as audio_bed
+from compositor import Compositor
+from render_debug import dump
+from assets import path as asset, prefetch as prefetch_assets
+from image_ingest import load as load_image, format_stats as image_stats
+from skin_cache import gradient_layer
+from fonts import get_font, fit_text as fit_lines
+from pipeline import run as run_pipeline
+import llm, net
+from compress import compress
+from prefetch import Prefetcher
+from article_cache import fetch as fetch_cached, RUN as article_stats
+from llm_cache import stats as cache_stats, format_stats
+from dedup import is_duplicate
+import artifact_cache as artifacts
+import spans
+from poller import poll, report as poll_report, ig_container_state, fb_finish_state
 
 ImageFile.LOAD_TRUNCATED_IMAGES = True
-cloudinary.config(cloud_name=config.CLOUDINARY_CLOUD_NAME, api_key=config.CLOUDINARY_API_KEY, api_secret=config.CLOUDINARY_API_SECRET)
+
+# Heavy clients load on first use, so a run that finds no news never imports them
+Article = Lazy("newspaper", "Article")
+DDGS = Lazy("duckduckgo_search", "DDGS")
+
+def _cloudinary(m):
+    import cloudinary.uploader
+    m.config(cloud_name=config.CLOUDINARY_CLOUD_NAME, api_key=config.CLOUDINARY_API_KEY, api_secret=config.CLOUDINARY_API_SECRET)
+
+cloudinary = Lazy("cloudinary", then=_cloudinary)
 
 PREMIUM_SOURCES = ["reuters", "associated-press", "bbc-news", "cnn", "bloomberg", "the-wall-street-journal", "the-washington-post", "time", "wired", "the-verge", "techcrunch", "business-insider", "fortune", "cnbc", "abc-news", "cbs-news", "nbc-news", "politico", "axios", "the-hill", "usa-today", "the-independent", "the-telegraph", "france-24", "dw-news", "scmp", "the-hindu", "the-times-of-india", "variety", "hollywood-reporter", "rolling-stone", "ign", "espn", "bleacher-report", "national-geographic", "new-scientist", "scientific-american", "nature", "the-economist", "hacker-news", "ars-technica", "engadget", "gizmodo", "mashable", "vox", "new-york-magazine", "the-atlantic"]
 
@@ -17,19 +42,12 @@ GENERIC_TAGS = "#news #breakingnews #viral #trending"
 def log(step, msg): print(f"[{datetime.now().strftime('%H:%M:%S')}] 🔹 {step.upper()}: {msg}")
 
 def send_telegram(msg):
-    try: requests.post(f"https://api.telegram.org/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage", data={"chat_id": config.TELEGRAM_ADMIN_ID, "text": msg, "parse_mode": "Markdown"}, timeout=5)
+    try: net.post(f"https://api.telegram.org/bot{config.TELEGRAM_BOT_TOKEN}/sendMessage", data={"chat_id": config.TELEGRAM_ADMIN_ID, "text": msg, "parse_mode": "Markdown"}, timeout=5)
     except: pass
 
 def ensure_assets():
-    os.makedirs('assets/audio', exist_ok=True)
-    tracks = {
-        "crisis": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3", 
-        "tech": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-2.mp3", 
-        "general": "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-3.mp3"
-    }
-    for n, u in tracks.items():
-        if not os.path.exists(f"assets/audio/{n}.mp3"): os.system(f"wget -q -O assets/audio/{n}.mp3 {u}")
-    if not os.path.exists("Anton.ttf"): os.system("wget -q -O Anton.ttf https://github.com/google/fonts/raw/main/ofl/anton/Anton-Regular.ttf")
+    # Fonts up front (every render needs them); the mood track is fetched lazily by render_video
+    prefetch_assets("Anton.ttf")
 
 def get_best_groq_model(client):
     try:
@@ -43,168 +61,197 @@ def is_garbage(title):
     t = title.lower()
     ads = ["gift guide", "buying guide", "deals under", "best deals", "save $", "shop the", "top picks for christmas"]
     if any(x in t for x in ads): return True
-    if not os.path.exists("history_v2.txt"): return False
-    with open("history_v2.txt", "r") as f:
-        for l in f:
-            if "|" in l and difflib.SequenceMatcher(None, t, l.split("|")[0].lower()).ratio() > 0.8: return True
-    return False
+    return is_duplicate(t, "history_v2.txt")
 
+@spans.traced("news")
 def fetch_news():
     log("NEWS", "Sourcing from Whitelist...")
     cands = []
     for i in range(0, 30, 15):
         try:
-            r = requests.get(f"https://newsapi.org/v2/top-headlines?sources={','.join(PREMIUM_SOURCES[i:i+15])}&apiKey={config.NEWS_API_KEY}", timeout=15).json()
+            r = net.get(f"https://newsapi.org/v2/top-headlines?sources={','.join(PREMIUM_SOURCES[i:i+15])}&apiKey={config.NEWS_API_KEY}", timeout=15).json()
             if r.get('status') == 'ok': cands.extend([a for a in r['articles'] if a.get('urlToImage') and not is_garbage(a['title'])])
         except: pass
     return cands[:15]
 
+def extract_text(url, html):
+    art = Article(url); art.download(input_html=html); art.parse()
+    return art.text
+
+@spans.traced("research.article", size=len)
+def fetch_article(article):
+    # Cached across runs: repeat headlines skip the download (or get a 304) and the parse
+    text = fetch_cached(article['url'], extract_text)
+    return text if text and len(text) > 500 else None
+
+@spans.traced("research.search", size=lambda r: sum(len(x) for x in r))
+def search_snippets(article):
+    with DDGS() as ddgs: return [r['body'] for r in ddgs.text(article['title'], max_results=3)]
+
+research = Prefetcher(fetch_article, search_snippets)
+
+@spans.traced("research", size=len)
 def perform_research(article):
     log("RESEARCH", f"Analyzing: {article['title']}")
-    try:
-        art = Article(article['url'])
-        art.download(); art.parse()
-        if len(art.text) > 500: return art.text[:2500]
-    except: pass
-    try:
-        with DDGS() as ddgs:
-            return "\n".join([r['body'] for r in ddgs.text(article['title'], max_results=3)])
-    except: return article.get('description', '')
+    found, origin = research.sources(article)
+    ctx, rep = compress(found + [article.get('description')], article['title'])
+    log("RESEARCH", f"Context from {origin}: {rep['tokens_in']} -> {rep['tokens_out']} tokens ({rep['saved']} saved, {rep['sentences']} sentences)")
+    return ctx
 
+@spans.traced("llm")
 def generate_content(art, ctx):
-    client = Groq(api_key=config.GROQ_API_KEY)
-    model = get_best_groq_model(client)
+    story_prompt = (
+        f"Analyze: {art['title']}\nContext: {ctx}\n"
+        f"Return JSON: {{\"mood\": \"CRISIS/TECH/GENERAL\", \"headline\": \"5-8 words\", \"summary\": \"EXACTLY 20-25 words UNIQUE facts\", "
+        f"\"caption\": \"IG caption: Hook, 3 bullets, question. No hashtags.\", \"hashtags\": [\"5 tags\"], "
+        f"\"deep_dive\": \"250 words starting with '🧠 DEEP DIVE:'\"}}"
+    )
+    d = llm.story(config.GROQ_API_KEY, get_best_groq_model, story_prompt)
+    if d: return d['mood'], d['headline'], d['summary'], f"{d['caption'][:2000]}\n{llm.hashtag_line(d['hashtags'])}\n.\n.\n{GENERIC_TAGS}", d['deep_dive']
+    log("AI", "Structured reply failed validation, using split calls")
     
     v_prompt = f"Analyze: {art['title']}\nContext: {ctx}\nReturn JSON: {{\"mood\": \"CRISIS/TECH/GENERAL\", \"headline\": \"5-8 words\", \"summary\": \"EXACTLY 20-25 words UNIQUE facts\"}}"
-    v_data = json.loads(client.chat.completions.create(messages=[{"role":"user","content":v_prompt}], model=model, response_format={"type": "json_object"}).choices[0].message.content)
+    v_data = json.loads(llm.complete(config.GROQ_API_KEY, get_best_groq_model, v_prompt, json_mode=True))
     
     cap_prompt = f"IG Caption for: {art['title']}. Hook, 3 bullets, question, 5 tags. Limit 2200 chars."
-    caption = client.chat.completions.create(messages=[{"role":"user","content":cap_prompt}], model=model).choices[0].message.content.strip() + f"\n.\n.\n{GENERIC_TAGS}"
+    caption = llm.complete(config.GROQ_API_KEY, get_best_groq_model, cap_prompt).strip() + f"\n.\n.\n{GENERIC_TAGS}"
     
     div_prompt = f"250-word deep dive starting with '🧠 DEEP DIVE:' for: {art['title']}\nContext: {ctx}"
-    comment = client.chat.completions.create(messages=[{"role":"user","content":div_prompt}], model=model).choices[0].message.content.strip()
+    comment = llm.complete(config.GROQ_API_KEY, get_best_groq_model, div_prompt).strip()
     
     return v_data['mood'], v_data['headline'], v_data['summary'], caption, comment
 
 def fit_text(draw, text, max_w, max_h, start_size):
-    size = start_size
-    while size > 25:
-        font = ImageFont.truetype("Anton.ttf", size)
-        lines = textwrap.wrap(text, width=int(max_w/(size*0.55)))
-        th = sum([draw.textbbox((0,0), l, font=font)[3] - draw.textbbox((0,0), l, font=font)[1] + 15 for l in lines])
-        if th < max_h: return font, lines
-        size -= 4
-    return ImageFont.truetype("Anton.ttf", 25), textwrap.wrap(text, width=28)
+    return fit_lines(text, max_w, max_h, start_size, asset("Anton.ttf"))
+
+def classic_base(W, H, color, sn):
+    # Cached bottom gradient + source pill drawn per render
+    base = gradient_layer(W, H, int(H*0.45), 240)
+    draw = ImageDraw.Draw(base)
+    f_s = get_font(asset("Anton.ttf"), 35)
+    draw.rounded_rectangle([(60,150), (60+draw.textlength(sn, f_s)+20, 210)], 12, fill=color)
+    draw.text((70,160), sn, font=f_s, fill="black")
+    return base
+
+@spans.traced("render.overlay")
+def render_skin(hl, summ, sn, color):
+    # Overlay for one story: classic base (gradient, source tag) + headline and summary
+    W, H = 1080, 1920
+    overlay = classic_base(W, H, color, sn)
+    draw = ImageDraw.Draw(overlay)
 
+    # --- FIXED: MOVED START POSITION UP TO Y=600 ---
+    # This gives massive room for the text to breathe
+    cy = 600 
+
+    # HEADLINE (Aggressive Size 140)
+    f_h, h_l = fit_text(draw, hl.upper(), 900, 600, 140) 
+    for l in h_l:
+        draw.text((65, cy+5), l, font=f_h, fill="black")
+        draw.text((60, cy), l, font=f_h, fill=color)
+        cy += f_h.size + 15
+
+    # --- FIXED: RELAXED SAFE LIMIT TO 1500 ---
+    SAFE_LIMIT = 1500
+
+    # SUMMARY (Aggressive Size 100)
+    # Now calculating remaining space from the NEW cy position (likely ~900-1000)
+    # resulting in ~500px of space for summary. Plenty.
+    f_u, s_l = fit_text(draw, summ, 900, SAFE_LIMIT-cy, 100)
+
+    cy += 30 # Gap between headline and summary
+    for l in s_l:
+        if cy > SAFE_LIMIT: break 
+        draw.text((60, cy), l, font=f_u, fill="white")
+        cy += f_u.size + 12
+    return overlay
+
+OUTPUT = "final_newsroom.mp4" # per bot: main, newsroom and abc_bot share one working dir under daemon.py
+
+@spans.traced("render", size=os.path.getsize)
 def render_video(art, mood, hl, summ):
     ensure_assets()
     cfg = {
-        "crisis": {"c": "#FF0000", "a": "assets/audio/crisis.mp3"}, 
-        "tech": {"c": "#00F0FF", "a": "assets/audio/tech.mp3"}, 
-        "general": {"c": "#FFD700", "a": "assets/audio/general.mp3"}
-    }.get(mood.lower(), {"c": "#FFD700", "a": "assets/audio/general.mp3"})
+        "crisis": {"c": "#FF0000", "a": "song1.mp3"}, 
+        "tech": {"c": "#00F0FF", "a": "song2.mp3"}, 
+        "general": {"c": "#FFD700", "a": "song3.mp3"}
+    }.get(mood.lower(), {"c": "#FFD700", "a": "song3.mp3"})
     
     try:
-        r = requests.get(art['urlToImage'], timeout=15)
-        if r.status_code != 200 or len(r.content) < 1000: raise Exception("Invalid Image")
-        with open("bg.jpg", "wb") as f: f.write(r.content)
-        Image.open("bg.jpg").verify() 
+        # Capped streaming download, decoded near target size and already cropped to 1080x1920
+        img, st, raw = load_image(art['urlToImage'])
+        dump("source", raw)
+        log("RENDER", f"Image: {image_stats(st)}")
     except Exception as e:
         log("RENDER", f"Image Failed: {e}")
         return None
 
     try:
-        W, H = 1080, 1920
-        overlay = Image.new('RGBA', (W, H), (0,0,0,0))
-        draw = ImageDraw.Draw(overlay)
-        grad = Image.new('L', (W, H), 0)
-        for y in range(int(H*0.45), H): ImageDraw.Draw(grad).line([(0,y),(W,y)], fill=int((y-H*0.45)/(H*0.55)*255))
-        overlay.paste(Image.new('RGBA',(W,H),(0,0,0,240)), (0,0), mask=grad)
-        
-        f_s = ImageFont.truetype("Anton.ttf", 35)
         sn = f" {art['source']['name'].upper()} "
-        draw.rounded_rectangle([(60,150), (60+draw.textlength(sn, f_s)+20, 210)], 12, fill=cfg["c"])
-        draw.text((70,160), sn, font=f_s, fill="black")
-        
-        # --- FIXED: MOVED START POSITION UP TO Y=600 ---
-        # This gives massive room for the text to breathe
-        cy = 600 
-
-        # HEADLINE (Aggressive Size 140)
-        f_h, h_l = fit_text(draw, hl.upper(), 900, 600, 140) 
-        for l in h_l:
-            draw.text((65, cy+5), l, font=f_h, fill="black")
-            draw.text((60, cy), l, font=f_h, fill=cfg["c"])
-            cy += f_h.size + 15
-        
-        # --- FIXED: RELAXED SAFE LIMIT TO 1500 ---
-        SAFE_LIMIT = 1500
-        
-        # SUMMARY (Aggressive Size 100)
-        # Now calculating remaining space from the NEW cy position (likely ~900-1000)
-        # resulting in ~500px of space for summary. Plenty.
-        f_u, s_l = fit_text(draw, summ, 900, SAFE_LIMIT-cy, 100)
-        
-        cy += 30 # Gap between headline and summary
-        for l in s_l:
-            if cy > SAFE_LIMIT: break 
-            draw.text((60, cy), l, font=f_u, fill="white")
-            cy += f_u.size + 12
-            
-        overlay.save("overlay.png")
-        img = Image.open("bg.jpg").convert("RGB")
-        bw, bh = img.size
-        ratio = 1080/1920
-        if bw/bh > ratio:
-            nw = bh * ratio
-            img = img.crop(((bw-nw)/2, 0, (bw+nw)/2, bh))
-        else:
-            nh = bw/ratio
-            img = img.crop((0, (bh-nh)/2, bw, (bh-nh)/2 + nh))
-        img.resize((1080, 1920), Image.LANCZOS).save("temp_bg.jpg")
-        clip = ImageClip("temp_bg.jpg").set_duration(6).fl(lambda gf, t: np.array(Image.fromarray(gf(t)).resize([int(d*(1+0.04*t)) for d in Image.fromarray(gf(t)).size], Image.BILINEAR).crop((0,0,1080,1920))))
-        final = CompositeVideoClip([clip, ImageClip("overlay.png").set_duration(6)])
-        if os.path.exists(cfg["a"]): final = final.set_audio(AudioFileClip(cfg["a"]).subclip(0,6))
-        final.write_videofile("final.mp4", fps=24, codec='libx264', audio_codec='aac', preset='ultrafast', logger=None)
-        return "final.mp4"
+        overlay = render_skin(hl, summ, sn, cfg["c"])
+        dump("background", img)
+        clip = MotionEngine(img, zoom_path(0.04))
+        ui = Compositor(overlay)
+        frame = lambda t: ui.apply(clip.frame(t))
+        dump("overlay", overlay); dump("frame0", lambda: frame(0))
+        enc = encode(OUTPUT, frame, 6, 24, audio=audio_bed(cfg["a"], 6))
+        log("RENDER", f"Encoded {enc['frames']} frames in {enc['seconds']:.1f}s ({enc['bytes']} bytes)")
+        return OUTPUT
     except Exception as e:
         log("ERROR", f"Render Crash: {e}")
         return None
 
+@spans.traced("publish")
 def publish(path, cap, comm):
     try:
-        up = cloudinary.uploader.upload(path, resource_type="video")
-        r = requests.post(f"https://graph.facebook.com/v18.0/{config.IG_USER_ID}/media", data={"media_type": "REELS", "video_url": up['secure_url'], "caption": cap, "access_token": config.IG_ACCESS_TOKEN}).json()
-        if 'id' not in r: return False
-        cid = r['id']
-        for _ in range(15):
-            time.sleep(10)
-            s = requests.get(f"https://graph.facebook.com/v18.0/{cid}", params={"fields":"status_code", "access_token": config.IG_ACCESS_TOKEN}).json()
-            if s.get('status_code') == 'FINISHED':
-                p = requests.post(f"https://graph.facebook.com/v18.0/{config.IG_USER_ID}/media_publish", data={"creation_id": cid, "access_token": config.IG_ACCESS_TOKEN}).json()
-                if 'id' in p:
-                    time.sleep(10)
-                    requests.post(f"https://graph.facebook.com/v18.0/{p['id']}/comments", data={"message": comm, "access_token": config.IG_ACCESS_TOKEN})
-                    send_telegram(f"✅ *V2 Live:* {cap[:100]}...")
-                    return True
+        url = artifacts.remember(path, "cloudinary", lambda: cloudinary.uploader.upload(path, resource_type="video")['secure_url'])
+        scope = (config.IG_USER_ID, cap)
+        cid = artifacts.remember(path, "ig_container", lambda: net.post(f"https://graph.facebook.com/v18.0/{config.IG_USER_ID}/media", data={"media_type": "REELS", "video_url": url, "caption": cap, "access_token": config.IG_ACCESS_TOKEN}).json().get('id'), scope)
+        if not cid: return False
+        st = poll(lambda: ig_container_state(net.get(f"https://graph.facebook.com/v18.0/{cid}", params={"fields":"status_code", "access_token": config.IG_ACCESS_TOKEN}, timeout=20).json()), "IG", deadline=150)
+        log("PUBLISH", f"Container {st['state']} after {st['seconds']}s ({st['polls']} polls)")
+        if st['state'] in ("error", "published"): artifacts.drop(path, "ig_container", scope)
+        if st['ok']:
+            artifacts.drop(path, "ig_container", scope) # used up whether media_publish succeeds, returns no id or raises
+            p = net.post(f"https://graph.facebook.com/v18.0/{config.IG_USER_ID}/media_publish", data={"creation_id": cid, "access_token": config.IG_ACCESS_TOKEN}).json()
+            if 'id' in p:
+                time.sleep(10)
+                net.post(f"https://graph.facebook.com/v18.0/{p['id']}/comments", data={"message": comm, "access_token": config.IG_ACCESS_TOKEN})
+                send_telegram(f"✅ *V2 Live:* {cap[:100]}...\n⏱ {spans.breakdown()}")
+                return True
         return False
     except: return False
 
-if __name__ == "__main__":
-    ensure_assets()
+def finish_candidate(art, content):
+    log("BOT", f"Candidate: {art['title']}")
+    m, h, s, cp, cm = content
+    v = render_video(art, m, h, s)
+    if v and publish(v, cp, cm):
+        with open("history_v2.txt", "a") as f: f.write(f"{art['title']}|{art['url']}\n")
+        log("SUCCESS", "Done.")
+        return True
+    log("WARN", "Failed, trying next...")
+    return False
+
+@spans.scoped("newsroom")
+def run():
+    # One pass: fetch, research/write, render and post until a candidate is published. -> the published article or None
     log("BOT", "V2 Running...")
     cands = fetch_news()
-    if not cands: log("BOT", "No News.")
-    else:
-        for i, art in enumerate(cands):
-            log("BOT", f"Candidate #{i+1}: {art['title']}")
-            try:
-                ctx = perform_research(art)
-                m, h, s, cp, cm = generate_content(art, ctx)
-                v = render_video(art, m, h, s)
-                if v and publish(v, cp, cm):
-                    with open("history_v2.txt", "a") as f: f.write(f"{art['title']}|{art['url']}\n")
-                    log("SUCCESS", "Done.")
-                    break
-                else: log("WARN", "Failed, trying next...")
-            except Exception as e: log("ERROR", e)
+    if not cands:
+        log("BOT", "No News.")
+        return None
+    ensure_assets() # only once there is something to render
+    research.start(cands) # every candidate's article downloads while the first one is processed
+    stages = [("research", lambda art, _: perform_research(art)), ("llm", generate_content)]
+    try: winner = run_pipeline(cands, stages, finish_candidate, on_error=lambda art, e: log("ERROR", e))
+    finally: research.close()
+    log("RESEARCH", f"Article cache: {article_stats}")
+    log("AI", f"LLM cache: {format_stats(cache_stats())}")
+    log("PUBLISH", f"Artifact cache: {artifacts.RUN}")
+    log("PUBLISH", f"Processing times: {poll_report()}")
+    log("TIMING", spans.breakdown())
+    return winner
+
+if __name__ == "__main__":
+    run()
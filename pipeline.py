@@ -0,0 +1,66 @@
+# pipeline.py - runs research/LLM for the next candidates while the current one renders and posts
+import os, threading, queue
+from spans import carry
+
+DEPTH = int(os.getenv("PIPELINE_DEPTH", "1")) # how many finished results may wait between stages (each one is LLM/research spend dropped on publish)
+_DONE = object()
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.2)
+            return True
+        except queue.Full: pass
+    return False
+
+def _stage(fn, source, out, stop):
+    for item in source:
+        if item is _DONE: break
+        art, val, err = item
+        if err is None:
+            if stop.is_set(): return # checked right before the call: once a candidate is published only calls already running are wasted
+            try: val = fn(art, val)
+            except Exception as e: err = e
+        if not _put(out, (art, val, err), stop): return
+    _put(out, _DONE, stop)
+
+def _drain(q, stop):
+    while not stop.is_set():
+        try: item = q.get(timeout=0.2)
+        except queue.Empty: continue
+        yield item
+        if item is _DONE: return
+
+def run(cands, stages, sink, on_error=None, depth=None):
+    # stages: [(name, fn(art, prev_result))] run in background threads, one thread per stage,
+    # connected by bounded queues. sink(art, result) runs in the caller's thread in candidate
+    # order; a truthy return means the candidate was published and everything still in flight is dropped.
+    depth = depth or DEPTH
+    stop = threading.Event()
+    qs = [queue.Queue(maxsize=depth) for _ in stages]
+    source = ((art, None, None) for art in cands)
+    threads = []
+    for i, (name, fn) in enumerate(stages):
+        t = threading.Thread(target=carry(_stage), args=(fn, source if i == 0 else _drain(qs[i-1], stop), qs[i], stop), name=f"pipeline-{name}", daemon=True)
+        t.start(); threads.append(t)
+    winner = None
+    try:
+        for item in _drain(qs[-1], stop):
+            if item is _DONE: break
+            art, val, err = item
+            if err is None:
+                try:
+                    if sink(art, val):
+                        winner = art
+                        break
+                    continue
+                except Exception as e: err = e
+            if on_error: on_error(art, err)
+    finally:
+        # Cancel: stages stop picking up new candidates; calls already running finish in the background
+        stop.set()
+        for q in qs:
+            while True:
+                try: q.get_nowait()
+                except queue.Empty: break
+    return winner
@@ -0,0 +1,102 @@
+# prefetch.py - research for every candidate starts as soon as the news list is in; slow sites race a search fallback
+import os, time, threading
+from collections import deque
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, Future
+from spans import carry
+
+WORKERS = int(os.getenv("PREFETCH_WORKERS", "8"))
+PER_KEY = int(os.getenv("PREFETCH_PER_DOMAIN", "2")) # concurrent primary fetches per domain
+DEADLINE = float(os.getenv("PREFETCH_DEADLINE", "12")) # hard cap per article, from when its fetch starts
+RACE_AFTER = float(os.getenv("PREFETCH_RACE_AFTER", "3")) # start the fallback if the primary isn't back this long after it started
+
+def domain(art):
+    host = urlsplit(art.get('url') or "").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+def _settle(fut, fn, *a):
+    # Run fn into a Future we created ourselves; a cancelled one (close()) is left alone
+    if not fut.set_running_or_notify_cancel(): return
+    try: fut.set_result(fn(*a))
+    except BaseException as e: fut.set_exception(e)
+
+class Prefetcher:
+    # primary(art) -> text or None (e.g. download + parse); fallback(art) -> list of snippets (e.g. search)
+    def __init__(self, primary, fallback=None, key=domain, per_key=PER_KEY, deadline=DEADLINE, race_after=RACE_AFTER):
+        self.primary, self.fallback, self.key = primary, fallback, key
+        self.per_key, self.deadline, self.race_after = per_key, deadline, race_after
+        self.fetch = self.search = None # opened per run, see _submit / close
+        self.jobs, self.started, self.queued, self.active = {}, {}, {}, {}
+        self.lock = threading.Lock()
+
+    def start(self, cands):
+        for art in cands: self._submit(art)
+        return self
+
+    def _pump(self, k):
+        # Under self.lock: hand the key's queued articles to the pool while it has a free slot, so a busy
+        # domain's backlog waits here instead of parking pool workers that other domains could use
+        q = self.queued.get(k)
+        while q and self.active.get(k, 0) < self.per_key:
+            self.active[k] = self.active.get(k, 0) + 1
+            self.fetch.submit(carry(self._primary), k, self.fetch, self.search, *q.popleft())
+
+    def _primary(self, k, pool, search, art, p, s, began):
+        self.started[art['url']] = t0 = time.monotonic()
+        began.set()
+        if s is not None: search.submit(carry(self._fallback), art, p, s, t0)
+        try: _settle(p, self.primary, art)
+        finally:
+            with self.lock:
+                if self.fetch is pool: # not closed meanwhile
+                    self.active[k] -= 1
+                    self._pump(k)
+
+    def _fallback(self, art, p, s, t0):
+        # Raced against the primary from when it started, not from when it was queued
+        try:
+            if p.result(timeout=max(0, t0 + self.race_after - time.monotonic())): # primary was quick and good
+                if s.set_running_or_notify_cancel(): s.set_result(None)
+                return
+        except Exception: pass
+        _settle(s, self.fallback, art)
+
+    def _submit(self, art):
+        with self.lock:
+            if art['url'] in self.jobs: return self.jobs[art['url']]
+            if self.fetch is None:
+                self.fetch = ThreadPoolExecutor(WORKERS, thread_name_prefix="prefetch")
+                self.search = ThreadPoolExecutor(2, thread_name_prefix="prefetch-fallback") if self.fallback else None
+            job = self.jobs[art['url']] = (Future(), Future() if self.search else None, threading.Event())
+            k = self.key(art)
+            self.queued.setdefault(k, deque()).append((art, *job))
+            self._pump(k)
+            return job
+
+    def sources(self, art):
+        # -> (texts, origin): the primary text if it lands within the deadline, else the fallback, else ([], "none")
+        p, s, began = self._submit(art)
+        began.wait(self.deadline) # still queued behind its domain: wait for a slot, at most one deadline
+        end = self.started.get(art['url'], time.monotonic()) + self.deadline
+        try:
+            text = p.result(timeout=max(0, end - time.monotonic()))
+            if text: return [text], "primary"
+        except Exception: pass
+        if s is not None:
+            try:
+                snippets = s.result(timeout=max(0.5, end - time.monotonic()))
+                if snippets: return list(snippets), "fallback"
+            except Exception: pass
+        return [], "none"
+
+    def close(self):
+        # Anything still downloading is abandoned, not waited for; the next start() opens fresh pools (daemon runs)
+        with self.lock:
+            pools, self.fetch, self.search = (self.fetch, self.search), None, None
+            queued, self.jobs, self.started, self.queued, self.active = self.queued, {}, {}, {}, {}
+        for q in queued.values():
+            for _, p, s, _ in q:
+                for f in (p, s):
+                    if f is not None: f.cancel()
+        for ex in pools:
+            if ex: ex.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,25 @@
+# publisher.py - fans a finished video out to every platform at once and collects one report
+import time
+from concurrent.futures import ThreadPoolExecutor
+from spans import span, carry
+
+def _timed(name, fn, args):
+    t0 = time.perf_counter()
+    with span(f"publish.{name}") as s:
+        try: ok, err = bool(fn(*args)), None
+        except Exception as e: ok, err = False, str(e)
+        s.set(outcome="ok" if ok else "error" if err else "empty", **({"error": err[:200]} if err else {}))
+    return {"ok": ok, "seconds": round(time.perf_counter() - t0, 1), "error": err}
+
+def publish_all(jobs):
+    # jobs: {"IG": (post_fn, *args), ...} -> {"IG": {"ok", "seconds", "error"}, ..., "_total": seconds}
+    t0 = time.perf_counter()
+    with span("publish"), ThreadPoolExecutor(max_workers=max(1, len(jobs)), thread_name_prefix="publish") as ex:
+        futs = {name: ex.submit(carry(_timed), name, job[0], job[1:]) for name, job in jobs.items()}
+        report = {name: f.result() for name, f in futs.items()}
+    report["_total"] = round(time.perf_counter() - t0, 1)
+    return report
+
+def format_report(report):
+    parts = [f"{k}:{v['ok']} ({v['seconds']}s{', ' + v['error'][:60] if v['error'] else ''})" for k, v in report.items() if k != "_total"]
+    return " | ".join(parts) + f" | wall {report['_total']}s"
@@ -0,0 +1,19 @@
+# render_debug.py - renders stay in memory; set RENDER_DEBUG_DIR to get the intermediates written out for inspection
+import os, time
+import numpy as np
+from PIL import Image
+
+DIR = os.getenv("RENDER_DEBUG_DIR", "")
+
+def dump(name, obj):
+    # bytes -> raw file (the download), PIL image / array -> PNG, callable -> called first. No-op unless RENDER_DEBUG_DIR is set.
+    if not DIR: return
+    try:
+        if callable(obj): obj = obj()
+        os.makedirs(DIR, exist_ok=True)
+        stem = os.path.join(DIR, f"{time.strftime('%H%M%S')}_{name}")
+        if isinstance(obj, (bytes, bytearray)):
+            with open(stem + ".bin", "wb") as f: f.write(obj)
+        else:
+            (obj if isinstance(obj, Image.Image) else Image.fromarray(np.asarray(obj))).save(stem + ".png")
+    except Exception: pass
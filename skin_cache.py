@@ -0,0 +1,60 @@
+# skin_cache.py - static skin layers (gradients, fixed bars) built once, memoized and kept on disk between runs
+import os, hashlib, threading, numpy as np
+from collections import OrderedDict
+from PIL import Image
+
+CACHE_DIR = os.getenv("SKIN_CACHE_DIR", ".cache/skins")
+MAX_MEM, MAX_DISK = 6, 8 # ~8MB each; the real key space is 3 gradients + abc's 2 headline bars
+VERSION = 2 # bump when a builder changes so stale disk layers are ignored
+_mem = OrderedDict()
+_lock = threading.Lock() # _mem is shared by the render worker threads
+
+def gradient(w, h, top, alpha, color=(0, 0, 0)):
+    # Transparent above `top`, then a linear ramp to `alpha` at the bottom edge (same values as the old per-row loop)
+    arr = np.zeros((h, w, 4), dtype=np.uint8)
+    arr[..., :3] = color
+    ramp = ((np.arange(top, h) - top) / (h - top) * 255).astype(np.uint16)
+    arr[top:, :, 3] = ((ramp * alpha + 127) // 255).astype(np.uint8)[:, None]
+    return arr
+
+def gradient_layer(w, h, top, alpha, color=(0, 0, 0)):
+    # Cached gradient() as a fresh RGBA image to draw on
+    return base_layer(("gradient", w, h, top, alpha, color), lambda: gradient(w, h, top, alpha, color))
+
+def _prune():
+    try:
+        files = sorted((os.path.join(CACHE_DIR, f) for f in os.listdir(CACHE_DIR) if f.endswith(".npy")), key=os.path.getmtime)
+        for f in files[:-MAX_DISK]: os.remove(f)
+    except: pass
+
+def _build(build):
+    res = build()
+    if isinstance(res, Image.Image): res = np.asarray(res.convert("RGBA"))
+    return np.ascontiguousarray(res, dtype=np.uint8)
+
+def base_layer(key, build):
+    # key: (skin, ..., w, h) - anything repr-stable, and nothing per-render (jitter, source name); build() returns an RGBA image or array
+    k = hashlib.sha1(repr((VERSION, key)).encode()).hexdigest()[:20]
+    arr = _mem.get(k)
+    if arr is not None:
+        with _lock:
+            if k in _mem: _mem.move_to_end(k)
+    else:
+        path = os.path.join(CACHE_DIR, f"{k}.npy")
+        try:
+            arr = np.load(path)
+            os.utime(path)
+        except:
+            arr = _build(build)
+            if not arr[..., 3].any(): return Image.fromarray(arr, 'RGBA') # blank: nothing worth keeping
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp" # two threads may build the same layer
+                with open(tmp, "wb") as f: np.save(f, arr)
+                os.replace(tmp, path)
+                _prune()
+            except: pass
+        with _lock:
+            _mem[k] = arr
+            while len(_mem) > MAX_MEM: _mem.popitem(last=False)
+    return Image.fromarray(arr.copy(), 'RGBA')
@@ -0,0 +1,156 @@
+# spans.py - timing spans for every stage: one JSON line per span (seconds, bytes, outcome) and a per-run latency breakdown for the status message
+import os, json, time, uuid, threading, functools, contextvars
+from datetime import datetime
+
+PATH = os.getenv("TRACE_PATH", ".cache/trace.jsonl") # "" turns the file off; runs are still summed for the breakdown
+KEEP = int(os.getenv("TRACE_KEEP", "200")) # finished runs kept in PATH; 0 keeps everything
+_run = contextvars.ContextVar("spans_run", default=None)
+_parent = contextvars.ContextVar("spans_parent", default=None)
+_lock = threading.Lock()
+
+class Run:
+    # Totals for one bot run, keyed by span name: [seconds, count, bytes, errors]
+    def __init__(self, bot):
+        self.bot, self.id, self.t0 = bot, uuid.uuid4().hex[:12], time.perf_counter()
+        self.totals, self.lock = {}, threading.Lock()
+
+    def add(self, name, seconds, outcome, nbytes):
+        with self.lock:
+            t = self.totals.setdefault(name, [0.0, 0, 0, 0])
+            t[0] += seconds; t[1] += 1; t[2] += nbytes or 0; t[3] += outcome == "error"
+
+    def summary(self):
+        with self.lock: return {k: {"seconds": round(v[0], 2), "count": v[1], "bytes": v[2], "errors": v[3]} for k, v in self.totals.items()}
+
+def _emit(rec):
+    if not PATH: return
+    try:
+        with _lock:
+            if os.path.dirname(PATH): os.makedirs(os.path.dirname(PATH), exist_ok=True)
+            with open(PATH, "a") as f: f.write(json.dumps(rec, default=str) + "\n")
+    except OSError: pass
+
+def _trim():
+    # Once PATH holds a quarter more than KEEP finished runs, rewrite it with the spans of the last KEEP (and of runs still
+    # going). The rewrite is rare, but a line another process appends during it is lost.
+    if not PATH or KEEP <= 0: return
+    try:
+        with _lock:
+            with open(PATH) as f: lines = f.readlines()
+            ends = [i for i, l in enumerate(lines) if '"span": "run"' in l]
+            if len(ends) <= KEEP * 5 // 4: return
+            cut = ends[-KEEP - 1] + 1 # lines before this can only belong to dropped runs, runs still going, or no run
+            runs = [_run_of(l) for l in lines[:cut]]
+            old = {runs[i] for i in ends[:-KEEP]}
+            keep = [l for l, r in zip(lines, runs) if r is not None and r not in old] + lines[cut:]
+            with open(PATH + ".tmp", "w") as f: f.writelines(keep)
+            os.replace(PATH + ".tmp", PATH)
+    except OSError: pass
+
+def _run_of(line):
+    try: return json.loads(line).get("run")
+    except ValueError: return None
+
+def record(name, seconds, outcome="ok", **attrs):
+    # A finished span; also how a duration measured elsewhere (e.g. frame time inside the encode loop) is reported
+    run = _run.get()
+    if run: run.add(name, seconds, outcome, attrs.get("bytes"))
+    _emit({"at": datetime.now().isoformat(timespec="milliseconds"), "bot": run.bot if run else None, "run": run.id if run else None,
+           "span": name, "seconds": round(seconds, 4), "outcome": outcome, "parent": _parent.get(), "thread": threading.current_thread().name, **attrs})
+
+class span:
+    # with span("render.encode", path=p) as s: ...; s.set(bytes=n)
+    # outcome is "error" if the block raises, else whatever was set (default "ok")
+    def __init__(self, name, **attrs):
+        self.name, self.attrs = name, attrs
+
+    def set(self, **kw):
+        self.attrs.update(kw)
+        return self
+
+    def __enter__(self):
+        self.id = uuid.uuid4().hex[:8]
+        self._tok = _parent.set(self.id)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, et, e, tb):
+        seconds = time.perf_counter() - self.t0
+        _parent.reset(self._tok)
+        outcome = self.attrs.pop("outcome", "ok")
+        if et is not None: outcome, self.attrs["error"] = "error", f"{et.__name__}: {e}"[:200]
+        record(self.name, seconds, outcome, span_id=self.id, **self.attrs)
+        return False
+
+def traced(name, size=None):
+    # Decorator: the call is a span; a None/False return is outcome "empty"; size(result) -> bytes
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*a, **kw):
+            with span(name) as s:
+                r = fn(*a, **kw)
+                if r is None or r is False: s.set(outcome="empty")
+                elif size:
+                    try: s.set(bytes=size(r))
+                    except Exception: pass
+                return r
+        return inner
+    return wrap
+
+class scope:
+    # with scope("main"): one bot run; every span in this context (and threads started with carry()) is summed into it
+    def __init__(self, bot):
+        self.run = Run(bot)
+
+    def __enter__(self):
+        self._tok = _run.set(self.run)
+        return self.run
+
+    def __exit__(self, et, e, tb):
+        seconds = time.perf_counter() - self.run.t0
+        _emit({"at": datetime.now().isoformat(timespec="milliseconds"), "bot": self.run.bot, "run": self.run.id, "span": "run",
+               "seconds": round(seconds, 3), "outcome": "error" if et else "ok", "stages": self.run.summary()})
+        _trim()
+        _run.reset(self._tok)
+        return False
+
+def scoped(bot):
+    # Decorator form of scope(), for a bot's run()
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*a, **kw):
+            with scope(bot): return fn(*a, **kw)
+        return inner
+    return wrap
+
+def carry(fn):
+    # fn bound to the caller's run/parent span, for Thread targets and executor submits (threads don't inherit contextvars)
+    ctx = contextvars.copy_context()
+    return lambda *a, **kw: ctx.run(fn, *a, **kw)
+
+def breakdown(run=None, top=6):
+    # "news 0.8s | research 4.1s | llm 2.2s | render 24.9s (encode 23.7s, frames 21.0s) | publish 41.0s (poll 30.2s) | total 75s"
+    # Stage time is busy time: research/LLM for later candidates overlaps the render, so stages can add up to more than total.
+    run = run or _run.get()
+    if not run: return ""
+    s = run.summary()
+    parts = []
+    for name in sorted((k for k in s if "." not in k), key=lambda k: -s[k]["seconds"])[:top]:
+        kids = sorted(((k.split(".", 1)[1], v["seconds"]) for k, v in s.items() if k.startswith(name + ".")), key=lambda kv: -kv[1])[:3]
+        parts.append(f"{name} {s[name]['seconds']:.1f}s" + (f" ({', '.join(f'{k} {v:.1f}s' for k, v in kids)})" if kids else ""))
+    return " | ".join(parts + [f"total {time.perf_counter() - run.t0:.0f}s"])
+
+if __name__ == "__main__":
+    # python spans.py -> per-stage totals over the runs in TRACE_PATH, per bot
+    runs = {}
+    with open(PATH) as f:
+        for line in f:
+            try: rec = json.loads(line)
+            except ValueError: continue
+            if rec.get("span") == "run": runs.setdefault(rec["bot"], []).append(rec)
+    for bot, rs in runs.items():
+        agg = {}
+        for r in rs:
+            for k, v in r["stages"].items(): agg[k] = agg.get(k, 0) + v["seconds"]
+        mean = sum(r["seconds"] for r in rs) / len(rs)
+        print(f"{bot}: {len(rs)} runs, {mean:.0f}s mean | " + ", ".join(f"{k} {v / len(rs):.1f}s" for k, v in sorted(agg.items(), key=lambda kv: -kv[1])[:8]))